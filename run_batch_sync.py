@@ -1,13 +1,18 @@
 """
-Synchronous batch runner for WBAC scraper with retry mechanism
-Designed specifically for Windows to avoid asyncio/sync Playwright conflicts
+Batch runner for WBAC scraper with retry mechanism
+Designed specifically for Windows: the synchronous Playwright flow runs on a small
+set of long-lived browser sessions (one thread each) while a single asyncio loop
+drives concurrency and database writes
 Processes all entries with robust retry and monitoring capabilities
 """
+import os
 import sys
 import time
 import random
+import re
 import signal
 import gc
+import logging
 import psutil
 from datetime import datetime
 from threading import Thread
@@ -16,8 +21,11 @@ import asyncio
 import asyncpg
 
 # Import WBAC modules
-from wbac_modules.database_utils import connect_to_database, fetch_valuations_to_process
-from wbac_modules.windows_valuation import parse_valuation, get_valuation_windows
+from wbac_modules.database_utils import (
+    get_pool, close_pool, count_valuations_to_process, stream_valuations_to_process
+)
+from wbac_modules.windows_valuation import parse_valuation, get_valuation_windows, WindowsBrowserSession
+from wbac_modules.config import LOG_LEVEL
 
 # Ensure we're on Windows
 if sys.platform != 'win32':
@@ -28,9 +36,9 @@ class SyncRetryConfig:
     """Configuration for synchronous retry mechanism"""
     BROWSER_MAX_RETRIES = 3
     BATCH_MAX_RETRIES = 10
-    BROWSER_RECYCLING_THRESHOLD = 75
     MEMORY_CHECK_INTERVAL = 50
-    MAX_MEMORY_USAGE_MB = 2048
+    MAX_MEMORY_USAGE_MB = 2048  # Per browser session; the process tree may use this times MAX_CONCURRENT_VALUATIONS
+    BROWSER_MAX_PAGES = 250  # Relaunch a session's browser after this many valuations
     MIN_DELAY_BETWEEN_VALUATIONS = 2.0
     MAX_DELAY_BETWEEN_VALUATIONS = 5.0
     
@@ -38,6 +46,11 @@ class SyncRetryConfig:
     BROWSER_RETRY_DELAY_MAX = 30.0
     BATCH_RETRY_DELAY_BASE = 5.0
     BATCH_RETRY_DELAY_MAX = 120.0
+    
+    DB_BATCH_SIZE = 32  # Flush buffered DB writes every N results
+    MAX_CONCURRENT_VALUATIONS = 4  # Browser sessions running at the same time
+    DB_PREFETCH = 64  # Rows fetched per page when streaming entries
+    MAX_VALUATIONS_PER_SECOND = 1.0  # Site-wide cap on valuation starts across all sessions
 
 class SyncRetryStats:
     """Statistics tracking for retry mechanism"""
@@ -80,24 +93,18 @@ def signal_handler(signum, frame):
     
     # Force exit after 3 seconds if graceful shutdown doesn't work
     def force_exit():
-        import time
         time.sleep(3)
         print("\n[FORCE_EXIT] Forcing immediate exit...")
-        import os
         os._exit(0)
     
-    import threading
-    force_thread = threading.Thread(target=force_exit, daemon=True)
+    force_thread = Thread(target=force_exit, daemon=True)
     force_thread.start()
 
 def exponential_backoff(attempt, base_delay=2.0, max_delay=30.0):
-    """Calculate exponential backoff delay with jitter"""
-    delay = min(base_delay * (2 ** attempt), max_delay)
-    jitter = random.uniform(0.8, 1.2)
-    return delay * jitter
+    """Exponential backoff with full jitter (0 up to the capped delay), so retries spread out"""
+    return max(0.1, random.uniform(0, min(base_delay * (1 << min(attempt, 16)), max_delay)))
 
-def check_memory_usage():
-    """Check current memory usage"""
+def _read_memory_usage():
     process = psutil.Process()
     memory_info = process.memory_info()
     memory_mb = memory_info.rss / 1024 / 1024
@@ -108,58 +115,60 @@ def check_memory_usage():
         'percent': memory_percent
     }
 
-def force_memory_cleanup():
-    """Force garbage collection and memory cleanup"""
-    gc.collect()
-    time.sleep(0.1)
+async def check_memory_usage():
+    """Check current memory usage (psutil syscalls run off the event loop)"""
+    return await asyncio.to_thread(_read_memory_usage)
+
+async def force_memory_cleanup():
+    """Force garbage collection in a worker thread so other valuations keep running"""
+    await asyncio.to_thread(gc.collect)
+
+# DON'T retry these - they are valid "failure" results
+_NON_RETRY_ERRORS_RE = re.compile("|".join(map(re.escape, (
+    'car not found',
+    'vehicle not found',
+    'registration not found',
+    'no valuation found'
+))), re.IGNORECASE)
+
+# DO retry these - they are technical issues
+_RETRY_ERRORS_RE = re.compile("|".join(map(re.escape, (
+    'timeout',
+    'connection',
+    'network',
+    'element not attached',
+    'element is not attached',
+    'target closed',
+    'context was destroyed',
+    'browser has been closed',
+    'unexpected error'
+))), re.IGNORECASE)
 
 def should_retry_error(error_msg):
     """
     Determine if an error should trigger a retry or be treated as permanent failure.
     Car not found should NOT trigger retries - it's a valid result to record as failure.
     """
-    # Convert to lowercase for easier matching
-    error_lower = str(error_msg).lower()
-    
-    # DON'T retry these - they are valid "failure" results
-    non_retry_errors = [
-        'car not found',
-        'vehicle not found',
-        'registration not found',
-        'no valuation found'
-    ]
-    
-    for non_retry in non_retry_errors:
-        if non_retry in error_lower:
-            return False
-    
-    # DO retry these - they are technical issues
-    retry_errors = [
-        'timeout',
-        'connection',
-        'network',
-        'element not attached',
-        'target closed',
-        'context was destroyed',
-        'browser has been closed',
-        'unexpected error'
-    ]
+    # Both patterns are case-insensitive, so the message is searched as-is
+    error_msg = str(error_msg)
     
-    for retry_error in retry_errors:
-        if retry_error in error_lower:
-            return True
+    if _NON_RETRY_ERRORS_RE.search(error_msg):
+        return False
     
     # Default: don't retry unknown errors (treat as permanent failures)
-    return False
+    return bool(_RETRY_ERRORS_RE.search(error_msg))
 
-def sync_browser_level_retry(plate, mileage, max_retries=3):
-    """Browser-level retry with smart error classification"""
+def sync_browser_level_retry(plate, mileage, max_retries=3, session=None):
+    """
+    Browser-level retry with smart error classification.
+    Pass a WindowsBrowserSession (and call from its executor) to reuse its browser.
+    """
     for attempt in range(1, max_retries + 1):
         try:
             print(f"[{attempt}/{max_retries}] Processing {plate}")
             
             sync_stats.total_attempts += 1
-            valuation_text = get_valuation_windows(plate, mileage)
+            valuation_text = get_valuation_windows(plate, mileage, session)
             
             if valuation_text:
                 sync_stats.successes += 1
@@ -194,27 +203,24 @@ def sync_browser_level_retry(plate, mileage, max_retries=3):
                 sync_stats.failures += 1
                 return None
             
-            # Exponential backoff with jitter
-            delay = (2 ** attempt) + random.uniform(0, 2)
+            delay = exponential_backoff(attempt)
             print(f"[DELAY] Waiting {delay:.1f}s before retry...")
             time.sleep(delay)
     
     return None
 
-def process_single_valuation(row, attempt_num, total_entries):
-    """Process a single valuation with proper database operations"""
+async def process_single_valuation(row, plate, attempt_num, total_entries, pending, session):
+    """Process a single valuation and buffer the result for the next DB flush"""
     unique_id = row['unique_id']
-    plate = row['number_plate'].upper().strip()
     mileage = row['mileage']
     
     print(f"\n[{attempt_num}/{total_entries}] Processing: {plate} (ID: {unique_id})")
     
-    start_time = datetime.now()
-    
-    # Attempt to get valuation
-    valuation_text = sync_browser_level_retry(plate, mileage, max_retries=3)
-    
-    duration = datetime.now() - start_time
+    # Attempt to get valuation (sync Playwright runs on the session's own thread)
+    loop = asyncio.get_running_loop()
+    valuation_text = await loop.run_in_executor(
+        session.executor, sync_browser_level_retry, plate, mileage, 3, session
+    )
     
     if valuation_text:
         try:
@@ -223,216 +229,306 @@ def process_single_valuation(row, attempt_num, total_entries):
             
             if valuation_number and valuation_number > 0:
                 print(f"Valuation for {plate}: £{valuation_number:.2f}")
-                
-                # Insert successful valuation into database
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-                
-                try:
-                    result = loop.run_until_complete(
-                        insert_successful_valuation(unique_id, plate, valuation_number, mileage)
-                    )
-                    if result:
-                        print(f"DB INSERT SUCCESS: {plate} valuation: £{valuation_number:.2f}")
-                        print(f"✓ VERIFIED: Record {unique_id} exists in valid_valuation table")
-                        return True
-                    else:
-                        print(f"[DB_ERROR] Failed to insert {plate} valuation")
-                        return False
-                finally:
-                    loop.close()
+                pending.add_success(unique_id, plate, valuation_number, mileage)
+                return True
             else:
                 print(f"Could not parse valuation from: '{valuation_text}'")
                 # Treat parsing failure as a failed valuation
-                return await_insert_failed_valuation(unique_id, plate, "Could not parse valuation")
+                pending.add_failure(unique_id, plate, "Could not parse valuation")
+                return False
         
         except Exception as e:
             print(f"[PARSE_ERROR] {plate}: {e}")
-            return await_insert_failed_valuation(unique_id, plate, f"Parse error: {str(e)}")
+            pending.add_failure(unique_id, plate, f"Parse error: {str(e)}")
+            return False
     else:
         # No valuation returned - could be car not found or technical failure
         print(f"No valuation text returned for {plate} - likely car not found")
-        return await_insert_failed_valuation(unique_id, plate, "No valuation returned")
+        pending.add_failure(unique_id, plate, "No valuation returned")
+        return False
 
-def await_insert_failed_valuation(unique_id, plate, reason):
-    """Helper to insert failed valuation using async event loop"""
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
+INSERT_SUCCESSFUL_VALUATION_SQL = """
+    INSERT INTO car_pipeline.valid_valuation 
+    (unique_id, number_plate, valuation, mileage, created_at)
+    VALUES ($1, $2, $3, $4, NOW())
+    ON CONFLICT (unique_id) DO UPDATE SET
+    valuation = EXCLUDED.valuation,
+    created_at = EXCLUDED.created_at
+"""
+
+INSERT_FAILED_VALUATION_SQL = """
+    INSERT INTO car_pipeline.failed_valuations 
+    (unique_id, number_plate, failure_reason, created_at)
+    VALUES ($1, $2, $3, NOW())
+    ON CONFLICT (unique_id) DO UPDATE SET
+    failure_reason = EXCLUDED.failure_reason,
+    created_at = EXCLUDED.created_at
+"""
+
+class PendingWrites:
+    """Buffers valuation results so they are written to the database in batches"""
+    def __init__(self, batch_size=SyncRetryConfig.DB_BATCH_SIZE):
+        self.batch_size = batch_size
+        self.successes = []
+        self.failures = []
     
-    try:
-        result = loop.run_until_complete(
-            insert_failed_valuation(unique_id, plate, reason)
-        )
-        if result:
-            print(f"Added to failed_valuations: {unique_id}")
-            return True
-        else:
-            print(f"[DB_ERROR] Failed to insert failure record for {plate}")
-            return False
-    finally:
-        loop.close()
+    def add_success(self, unique_id, plate, valuation, mileage):
+        self.successes.append((unique_id, plate, valuation, mileage))
+    
+    def add_failure(self, unique_id, plate, reason):
+        self.failures.append((unique_id, plate, reason))
+    
+    def is_full(self):
+        return len(self.successes) + len(self.failures) >= self.batch_size
+    
+    async def flush(self, pool):
+        """Write all buffered results with executemany and clear the buffers (kept if the write fails)"""
+        successes, self.successes = self.successes, []
+        failures, self.failures = self.failures, []
+        if not (successes or failures):
+            return
+        
+        try:
+            async with pool.acquire() as conn:
+                if successes:
+                    if await insert_successful_valuations(conn, successes):
+                        print(f"DB INSERT SUCCESS: {len(successes)} valuations written")
+                    successes = []
+                
+                if failures:
+                    if await insert_failed_valuations(conn, failures):
+                        print(f"Added {len(failures)} records to failed_valuations")
+                    failures = []
+        except Exception:
+            # Put back whatever was not written so the next flush retries it
+            self.successes[:0] = successes
+            self.failures[:0] = failures
+            raise
 
-async def insert_successful_valuation(unique_id, plate, valuation, mileage):
-    """Insert successful valuation into database"""
+async def insert_successful_valuations(conn, records):
+    """Insert (unique_id, plate, valuation, mileage) records into valid_valuation"""
     try:
-        conn = await connect_to_database()
-        
-        query = """
-            INSERT INTO car_pipeline.valid_valuation 
-            (unique_id, number_plate, valuation, mileage, created_at)
-            VALUES ($1, $2, $3, $4, NOW())
-            ON CONFLICT (unique_id) DO UPDATE SET
-            valuation = EXCLUDED.valuation,
-            created_at = EXCLUDED.created_at
-        """
-        
-        await conn.execute(query, unique_id, plate, valuation, mileage)
-        await conn.close()
+        await conn.executemany(INSERT_SUCCESSFUL_VALUATION_SQL, records)
         return True
-        
     except Exception as e:
-        print(f"[DB_ERROR] Failed to insert successful valuation: {e}")
-        if 'conn' in locals():
-            await conn.close()
+        print(f"[DB_ERROR] Failed to insert successful valuations: {e}")
         return False
 
-async def insert_failed_valuation(unique_id, plate, reason):
-    """Insert failed valuation into database"""
+async def insert_failed_valuations(conn, records):
+    """Insert (unique_id, plate, reason) records into failed_valuations"""
     try:
-        conn = await connect_to_database()
-        
-        query = """
-            INSERT INTO car_pipeline.failed_valuations 
-            (unique_id, number_plate, failure_reason, created_at)
-            VALUES ($1, $2, $3, NOW())
-            ON CONFLICT (unique_id) DO UPDATE SET
-            failure_reason = EXCLUDED.failure_reason,
-            created_at = EXCLUDED.created_at
-        """
-        
-        await conn.execute(query, unique_id, plate, reason)
-        await conn.close()
+        await conn.executemany(INSERT_FAILED_VALUATION_SQL, records)
         return True
-        
     except Exception as e:
-        print(f"[DB_ERROR] Failed to insert failed valuation: {e}")
-        if 'conn' in locals():
-            await conn.close()
+        print(f"[DB_ERROR] Failed to insert failed valuations: {e}")
         return False
 
-def process_entries_sync():
+class Throttler:
     """
-    Process all database entries synchronously with retry mechanism
+    Async context manager that lets at most `rate_limit` entries through per
+    `period` seconds, shared by all workers. Entry times are reserved up front,
+    so concurrent workers are spaced out rather than released together.
     """
-    global sync_stats, graceful_shutdown
+    def __init__(self, rate_limit, period=1.0):
+        self.interval = period / rate_limit
+        self._next_start = 0.0
+    
+    async def __aenter__(self):
+        now = asyncio.get_running_loop().time()
+        start = max(now, self._next_start)
+        self._next_start = start + self.interval
+        if start > now:
+            await asyncio.sleep(start - now)
+        return self
     
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
+
+class BatchProgress:
+    """Counters shared by the concurrent valuation workers"""
+    def __init__(self, total_entries):
+        self.total_entries = total_entries
+        self.processed_count = 0
+        self.success_count = 0
+        self.failure_count = 0
+        self.consecutive_failures = 0
+    
+    def record(self, success):
+        if success:
+            self.success_count += 1
+            self.consecutive_failures = 0
+        else:
+            self.failure_count += 1
+            self.consecutive_failures += 1
+
+async def valuation_worker(sessions, row, progress, pending, pool, throttler):
+    """
+    Value one row on a browser session borrowed from the queue.
+    Queue items are (session, ready_at): the anti-detection delay is stored as a
+    cooldown on the session rather than slept while holding it, so the DB flush
+    overlaps with it and no delay is spent after a session's last valuation.
+    The shared throttler caps how fast valuations start across all sessions.
+    """
+    loop = asyncio.get_running_loop()
+    session, ready_at = await sessions.get()
+    try:
+        # Wait out whatever is left of this browser's cooldown
+        wait = ready_at - loop.time()
+        if wait > 0:
+            print(f"[WAIT] {wait:.1f}s delay...")
+            await asyncio.sleep(wait)
+        
+        if graceful_shutdown:
+            return
+        
+        progress.processed_count += 1
+        unique_id = row['unique_id']
+        plate = row['number_plate'].upper().strip()
+        
+        try:
+            # Process single valuation
+            async with throttler:
+                result = await process_single_valuation(
+                    row, plate, progress.processed_count, progress.total_entries, pending, session
+                )
+            progress.record(result)
+            
+            # Check for too many consecutive failures (usually the site, not memory)
+            if progress.consecutive_failures >= 5:
+                print(f"[WARNING] {progress.consecutive_failures} consecutive failures. Browser may need recycling.")
+                progress.consecutive_failures = 0  # Reset after warning
+            
+        except Exception as e:
+            print(f"[UNEXPECTED_ERROR] {plate}: {e}")
+            progress.record(False)
+            pending.add_failure(unique_id, plate, f"Unexpected error: {str(e)}")
+        
+        # Random delay before this browser's next valuation (anti-detection)
+        ready_at = loop.time() + random.uniform(
+            SyncRetryConfig.MIN_DELAY_BETWEEN_VALUATIONS,
+            SyncRetryConfig.MAX_DELAY_BETWEEN_VALUATIONS
+        )
+    finally:
+        sessions.put_nowait((session, ready_at))
+    
+    if pool and pending.is_full():
+        await pending.flush(pool)
+
+async def process_entries():
+    """
+    Process all database entries with a bounded pool of concurrent valuations
+    """
     print("="*70)
-    print("STARTING SYNCHRONOUS BATCH PROCESSING")
+    print("STARTING BATCH PROCESSING")
     print("="*70)
     
-    # Get all entries from database
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
+    pool = None
+    pending = PendingWrites()
+    browser_sessions = []
     
     try:
         print("Connecting to database...")
-        conn_result = loop.run_until_complete(connect_to_database())
-        
-        print("Fetching entries to process...")
-        rows = loop.run_until_complete(fetch_valuations_to_process(conn_result))
+        pool = await get_pool()
         
-        loop.run_until_complete(conn_result.close())
-        loop.close()
+        print("Counting entries to process...")
+        async with pool.acquire() as conn:
+            total_entries = await count_valuations_to_process(conn)
         
-        if not rows:
+        if not total_entries:
             print("No entries found to process!")
             return
         
-        total_entries = len(rows)
         print(f"Found {total_entries} entries to valuate")
+        print(f"Running up to {SyncRetryConfig.MAX_CONCURRENT_VALUATIONS} valuations concurrently")
+        
+        progress = BatchProgress(total_entries)
+        throttler = Throttler(SyncRetryConfig.MAX_VALUATIONS_PER_SECOND)
         
-        # Initialize tracking variables
-        processed_count = 0
-        success_count = 0
-        failure_count = 0
-        consecutive_failures = 0
-        browser_count = 0
+        # Each session keeps one browser open (fresh context per plate), relaunching
+        # it after BROWSER_MAX_PAGES or once the process tree, which holds every
+        # session's browser, grows beyond MAX_MEMORY_USAGE_MB per session
+        sessions = asyncio.Queue()
+        tree_memory_mb = SyncRetryConfig.MAX_MEMORY_USAGE_MB * SyncRetryConfig.MAX_CONCURRENT_VALUATIONS
+        for _ in range(SyncRetryConfig.MAX_CONCURRENT_VALUATIONS):
+            session = WindowsBrowserSession(
+                max_memory_mb=tree_memory_mb,
+                max_pages=SyncRetryConfig.BROWSER_MAX_PAGES
+            )
+            browser_sessions.append(session)
+            sessions.put_nowait((session, 0.0))
         
         print(f"\nStarting processing at {datetime.now().strftime('%H:%M:%S')}...")
         
-        for i, row in enumerate(rows):
-            if graceful_shutdown:
-                print(f"\n[INTERRUPT] Graceful shutdown requested. Processed {processed_count}/{total_entries}")
-                break
-                
-            processed_count += 1
-            unique_id = row['unique_id']
-            plate = row['number_plate'].upper().strip()
-            mileage = row['mileage']
-            salvage_category = row.get('salvage_category')
-            
-            print(f"\n[{processed_count}/{total_entries}] Processing: {plate} (ID: {unique_id})")
-            
+        # Rows are streamed a page at a time into a bounded queue, so
+        # valuation starts with the first row and only a few rows are held at once
+        worker_count = SyncRetryConfig.MAX_CONCURRENT_VALUATIONS
+        rows = asyncio.Queue(maxsize=worker_count * 2)
+        
+        async def producer():
             try:
-                # Process single valuation
-                result = process_single_valuation(row, processed_count, total_entries)
-                
-                if result:
-                    success_count += 1
-                    consecutive_failures = 0
-                else:
-                    failure_count += 1
-                    consecutive_failures += 1
-                
-                # Check for too many consecutive failures (restart browser)
-                if consecutive_failures >= 5:
-                    print(f"[WARNING] {consecutive_failures} consecutive failures. Browser may need recycling.")
-                    force_memory_cleanup()
-                    consecutive_failures = 0  # Reset after cleanup
-                
-                # Browser recycling
-                browser_count += 1
-                if browser_count >= 75:  # Browser recycling threshold
-                    print(f"[RECYCLE] Browser recycled after {browser_count} operations")
-                    browser_count = 0
-                    force_memory_cleanup()
-                
-                # Random delay between operations (anti-detection)
-                if processed_count < total_entries:
-                    delay = random.uniform(2, 5)
-                    print(f"[WAIT] {delay:.1f}s delay...")
-                    time.sleep(delay)
-                
-            except Exception as e:
-                print(f"[UNEXPECTED_ERROR] {plate}: {e}")
-                failure_count += 1
-                consecutive_failures += 1
-                
-                # Insert failure record
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-                loop.run_until_complete(
-                    insert_failed_valuation(unique_id, plate, f"Unexpected error: {str(e)}")
-                )
-                loop.close()
+                async with pool.acquire() as conn:
+                    async for row in stream_valuations_to_process(conn, SyncRetryConfig.DB_PREFETCH):
+                        if graceful_shutdown:
+                            break
+                        await rows.put(row)
+            finally:
+                # One stop marker per worker
+                for _ in range(worker_count):
+                    await rows.put(None)
+        
+        async def worker():
+            while True:
+                row = await rows.get()
+                if row is None:
+                    return
+                try:
+                    await valuation_worker(sessions, row, progress, pending, pool, throttler)
+                except Exception as e:
+                    # Keep draining the queue so the producer never blocks on a dead worker
+                    print(f"[WORKER_ERROR] {e}")
+        
+        results = await asyncio.gather(
+            producer(), *[worker() for _ in range(worker_count)],
+            return_exceptions=True
+        )
+        if isinstance(results[0], Exception):
+            raise results[0]
+        
+        if graceful_shutdown:
+            print(f"\n[INTERRUPT] Graceful shutdown requested. Processed {progress.processed_count}/{total_entries}")
+        
+        # Write whatever is still buffered
+        await pending.flush(pool)
         
         # Final statistics
+        processed_count = progress.processed_count
         print(f"\n" + "="*70)
         print("BATCH PROCESSING COMPLETED")
         print("="*70)
         sync_stats.print_stats()
         print(f"Total processed: {processed_count}/{total_entries}")
-        print(f"Successful: {success_count}")
-        print(f"Failed: {failure_count}")
-        print(f"Success rate: {(success_count/processed_count*100):.1f}%" if processed_count > 0 else "N/A")
+        print(f"Successful: {progress.success_count}")
+        print(f"Failed: {progress.failure_count}")
+        print(f"Success rate: {(progress.success_count/processed_count*100):.1f}%" if processed_count > 0 else "N/A")
         
     except Exception as e:
         print(f"[FATAL_ERROR] Batch processing failed: {e}")
-        import traceback
         traceback.print_exc()
         
     finally:
-        force_memory_cleanup()
+        for session in browser_sessions:
+            try:
+                await asyncio.to_thread(session.close)
+            except Exception as e:
+                print(f"Browser session close error: {e}")
+        if pool:
+            try:
+                # Don't lose results buffered before an interrupt or fatal error
+                await pending.flush(pool)
+                await close_pool()
+            except Exception as e:
+                print(f"[DB_ERROR] Error closing database pool: {e}")
+        await force_memory_cleanup()
 
 def print_system_info():
     """Print system information"""
@@ -455,10 +551,12 @@ def print_system_info():
     print("=" * 70)
     print(f"Browser retries: {SyncRetryConfig.BROWSER_MAX_RETRIES}")
     print(f"Batch retries: {SyncRetryConfig.BATCH_MAX_RETRIES}")
-    print(f"Browser recycling: Every {SyncRetryConfig.BROWSER_RECYCLING_THRESHOLD} operations")
+    print(f"Browser recycling: When memory exceeds {SyncRetryConfig.MAX_MEMORY_USAGE_MB}MB per session or every {SyncRetryConfig.BROWSER_MAX_PAGES} valuations")
     print(f"Memory monitoring: Every {SyncRetryConfig.MEMORY_CHECK_INTERVAL} operations")
-    print(f"Max memory: {SyncRetryConfig.MAX_MEMORY_USAGE_MB}MB")
+    print(f"Max memory: {SyncRetryConfig.MAX_MEMORY_USAGE_MB}MB per session")
     print(f"Processing delay: {SyncRetryConfig.MIN_DELAY_BETWEEN_VALUATIONS}-{SyncRetryConfig.MAX_DELAY_BETWEEN_VALUATIONS}s")
+    print(f"Concurrent valuations: {SyncRetryConfig.MAX_CONCURRENT_VALUATIONS}")
+    print(f"Rate limit: {SyncRetryConfig.MAX_VALUATIONS_PER_SECOND} valuations/s")
 
 def main():
     """Main entry point"""
@@ -469,12 +567,14 @@ def main():
     if hasattr(signal, 'SIGTERM'):
         signal.signal(signal.SIGTERM, signal_handler)
     
+    logging.basicConfig(level=LOG_LEVEL, format="%(message)s")
+    
     try:
         print("WBAC Scraper - Synchronous Batch Processor")
         print(f"Started at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
         
         print_system_info()
-        process_entries_sync()
+        asyncio.run(process_entries())
         
     except KeyboardInterrupt:
         print("\n[KEYBOARD_INTERRUPT] Ctrl+C detected. Exiting...")
@@ -482,12 +582,11 @@ def main():
         sys.exit(0)
     except Exception as e:
         print(f"\n[FATAL_ERROR] Unexpected error: {e}")
-        import traceback
         traceback.print_exc()
         sys.exit(1)
     finally:
         print("\n[CLEANUP] Final cleanup...")
-        force_memory_cleanup()
+        gc.collect()  # event loop has already exited
         print("Batch processor shutdown complete.")
 
 if __name__ == "__main__":
@@ -1,108 +1,120 @@
 """
 Main entry point for WeBuyAnyCar (WBAC) valuation system.
 This script provides a command-line interface for running either batch processing
-or single plate testing.
+or single plate testing, in one of three modes:
+  async         - batch/single plate through process_manager (default)
+  enhanced      - batch processing with the retry mechanism and progress monitoring
+  windows-sync  - single plate testing with the synchronous Windows implementation
 
 To run on Windows:
 1. Make sure all dependencies are installed: pip install -r requirements.txt
 2. Install Playwright browsers: python -m playwright install
 3. Run this script: python run_wbac.py
 """
-import os
 import sys
 import asyncio
 import traceback
 import argparse
+import logging
+import platform
+from importlib.metadata import distribution, PackageNotFoundError
 
-# Import nest_asyncio to allow nested event loops 
-# (useful when running in certain environments or when using asyncio with other async frameworks)
-try:
-    import nest_asyncio
-    nest_asyncio.apply()
-    print("Nest-asyncio applied successfully.")
-except ImportError:
-    print("Warning: nest_asyncio not found. This may cause issues in Jupyter environments.")
+# Apply nest_asyncio only inside a Jupyter kernel, where an event loop is already running.
+# It patches asyncio for every await, so plain command-line runs go without it.
+if "IPython" in sys.modules and "ipykernel" in sys.modules:
+    try:
+        import nest_asyncio
+        nest_asyncio.apply()
+        print("Nest-asyncio applied successfully.")
+    except ImportError:
+        print("Warning: nest_asyncio not found. This may cause issues in Jupyter environments.")
 
-def check_requirements():
-    """Check if required packages are installed"""
+def use_fast_event_loop():
+    """Run the event loop on uvloop where it is installed (not on Windows or inside Jupyter)"""
+    if sys.platform == 'win32' or "ipykernel" in sys.modules:
+        return
     try:
-        import playwright
-        import asyncpg
-    except ImportError as e:
-        print(f"ERROR: Missing required package - {e}")
+        import uvloop
+    except ImportError:
+        return
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+
+# Packages each mode needs
+MODE_REQUIREMENTS = {
+    "async": ("playwright", "asyncpg"),
+    "enhanced": ("playwright", "asyncpg", "psutil"),
+    "windows-sync": ("playwright",),
+}
+
+def check_requirements(mode="async"):
+    """Check if required packages are installed (reads package metadata, no imports)"""
+    missing = []
+    for package in MODE_REQUIREMENTS[mode]:
+        try:
+            distribution(package)
+        except PackageNotFoundError:
+            missing.append(package)
+    if missing:
+        print(f"ERROR: Missing required package - {', '.join(missing)}")
         print("\nPlease install required packages using:")
         print("pip install -r requirements.txt")
         print("python -m playwright install")
+        if "psutil" in missing:
+            print("pip install psutil")
         return False
     return True
 
-async def main():
-    """Main entry point with command line argument handling"""
-    if not check_requirements():
-        return
-        
-    # Import here to avoid errors if requirements aren't met
-    try:
-        # Import our modules
-        from wbac_modules.process_manager import process_all_entries, process_single_plate
-    except ImportError as e:
-        print(f"ERROR: Could not import WBAC modules - {e}")
-        print("Make sure you're running from the correct directory")
-        return
-    
-    parser = argparse.ArgumentParser(description="WeBuyAnyCar (WBAC) Valuation System")
+def parse_args():
+    """Parse command line arguments (before any backend is imported)"""
+    parser = argparse.ArgumentParser(
+        description="WeBuyAnyCar (WBAC) Valuation System",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python run_wbac.py --batch                                     # Process all entries
+  python run_wbac.py --mode enhanced --batch                     # Batch with progress monitoring
+  python run_wbac.py --mode enhanced --plate DF15ZXB --mileage 50000  # Test with specific mileage
+  python run_wbac.py --mode windows-sync --plate DF15ZXB         # Synchronous Windows test
+        """
+    )
+    parser.add_argument("--mode", choices=sorted(MODE_REQUIREMENTS), default="async",
+                        help="Backend to run (default: async)")
     parser.add_argument("--plate", help="Process a single license plate")
     parser.add_argument("--mileage", type=int, help="Vehicle mileage for single plate testing")
     parser.add_argument("--batch", action="store_true", help="Run batch processing from database")
+    parser.add_argument("--status", action="store_true", help="Show system status and configuration (enhanced mode)")
+    return parser.parse_args()
+
+def main():
+    """Main entry point with command line argument handling"""
+    args = parse_args()
     
-    args = parser.parse_args()
+    if not check_requirements(args.mode):
+        return
     
-    # Display menu if no arguments provided
-    if not (args.plate or args.batch):
-        print("\n" + "="*60)
-        print("WeBuyAnyCar (WBAC) Valuation System")
-        print("="*60)
-        print("1. Process all entries from database")
-        print("2. Test a single plate")
-        print("0. Exit")
-        print("="*60)
-        
-        choice = input("Enter your choice: ")
-        
-        if choice == "1":
-            try:
-                await process_all_entries()
-            except Exception as e:
-                print(f"\nERROR processing entries: {e}")
-                traceback.print_exc()
-        elif choice == "2":
-            plate = input("Enter license plate: ").strip().upper()
-            mileage_input = input("Enter mileage (default 100000): ").strip()
-            try:
-                mileage = int(mileage_input) if mileage_input else 100000
-                await process_single_plate(plate, mileage)
-            except ValueError:
-                print("Invalid mileage value. Please enter a number.")
-            except Exception as e:
-                print(f"\nERROR processing plate {plate}: {e}")
-                traceback.print_exc()
-        elif choice == "0":
-            print("Exiting...")
-            return
-        else:
-            print("Invalid choice.")
-            return
+    # Only the chosen mode's backend gets imported
+    from wbac_modules import cli
+    from wbac_modules.config import LOG_LEVEL
+    logging.basicConfig(level=LOG_LEVEL, format="%(message)s")
     
-    # Process command line arguments
-    elif args.plate:
-        mileage = args.mileage if args.mileage is not None else 100000
-        await process_single_plate(args.plate.strip().upper(), mileage)
-    elif args.batch:
-        await process_all_entries()
+    if args.mode == "windows-sync":
+        if platform.system() != 'Windows':
+            print("windows-sync mode is intended for Windows only. Please use --mode async instead.")
+            return
+        cli.run_windows_sync_mode(args)
+    elif args.mode == "enhanced":
+        # Ensure we're using the correct event loop policy for Windows
+        if sys.platform == 'win32':
+            asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+        use_fast_event_loop()
+        asyncio.run(cli.run_enhanced_mode(args))
+    else:
+        use_fast_event_loop()
+        asyncio.run(cli.run_async_mode(args))
 
 if __name__ == "__main__":
     try:
-        asyncio.run(main())
+        main()
     except KeyboardInterrupt:
         print("\nOperation cancelled by user")
     except Exception as e:
@@ -3,8 +3,8 @@ Test the synchronous batch runner with just a few entries
 This ensures everything works before running the full 2815 entries
 """
 import sys
-import time
 import asyncio
+import time
 from datetime import datetime
 
 def test_small_batch():
@@ -16,8 +16,10 @@ def test_small_batch():
     try:
         # Import required modules
         from wbac_modules.database_utils import connect_to_database, fetch_valuations_to_process
-        from run_batch_sync import sync_browser_level_retry, sync_stats, SyncRetryConfig
-        from wbac_modules.windows_valuation import parse_valuation
+        from run_batch_sync import (
+            sync_stats, SyncRetryConfig, PendingWrites, BatchProgress, Throttler, valuation_worker
+        )
+        from wbac_modules.windows_valuation import WindowsBrowserSession
         
         # Get just a few entries from database
         async def get_sample_data():
@@ -45,35 +47,41 @@ def test_small_batch():
         
         print(f"\nStarting processing at {datetime.now().strftime('%H:%M:%S')}...")
         
-        success_count = 0
-        
-        for i, row in enumerate(rows):
-            plate = row['number_plate'].upper().strip()
-            mileage = row['mileage']
-            
-            print(f"\n[{i+1}/{len(rows)}] Testing {plate} (mileage: {mileage})")
+        # Same worker, browser sessions and rate limiter as run_batch_sync; results
+        # stay in the write buffer because no pool is given, so nothing is saved
+        async def value_sample():
+            progress = BatchProgress(len(rows))
+            pending = PendingWrites()
+            throttler = Throttler(SyncRetryConfig.MAX_VALUATIONS_PER_SECOND)
+            sessions = asyncio.Queue()
+            session_count = min(len(rows), SyncRetryConfig.MAX_CONCURRENT_VALUATIONS)
+            browser_sessions = [
+                WindowsBrowserSession(max_memory_mb=SyncRetryConfig.MAX_MEMORY_USAGE_MB * session_count)
+                for _ in range(session_count)
+            ]
+            for session in browser_sessions:
+                sessions.put_nowait((session, 0.0))
             
-            start_time = datetime.now()
-            valuation_text = sync_browser_level_retry(plate, mileage, max_retries=2)  # Reduce retries for testing
-            duration = datetime.now() - start_time
-            
-            if valuation_text:
-                try:
-                    valuation_number = parse_valuation(valuation_text)
-                    if valuation_number and valuation_number > 0:
-                        print(f"[SUCCESS] {plate}: £{valuation_number:.2f} (took {duration.total_seconds():.1f}s)")
-                        success_count += 1
-                    else:
-                        print(f"[PARSE_ERROR] {plate}: Could not parse '{valuation_text}'")
-                except Exception as e:
-                    print(f"[PARSE_ERROR] {plate}: {e}")
-            else:
-                print(f"[FAILED] {plate}: No valuation retrieved")
-            
-            # Small delay between tests
-            if i < len(rows) - 1:
-                print("Waiting 3 seconds...")
-                time.sleep(3)
+            try:
+                await asyncio.gather(
+                    *[valuation_worker(sessions, row, progress, pending, None, throttler) for row in rows]
+                )
+            finally:
+                for session in browser_sessions:
+                    await asyncio.to_thread(session.close)
+            return pending
+        
+        start_ns = time.perf_counter_ns()
+        pending = asyncio.run(value_sample())
+        duration_s = (time.perf_counter_ns() - start_ns) / 1e9
+        
+        for unique_id, plate, valuation_number, mileage in pending.successes:
+            print(f"[SUCCESS] {plate}: £{valuation_number:.2f}")
+        for unique_id, plate, reason in pending.failures:
+            print(f"[FAILED] {plate}: {reason}")
+        print(f"Sample took {duration_s:.1f}s")
+        
+        success_count = len(pending.successes)
         
         # Print results
         print(f"\n" + "=" * 50)
@@ -3,7 +3,6 @@ Test the fixed retry logic with smart error classification
 """
 import sys
 import time
-from datetime import datetime
 
 def test_fixed_retry():
     """Test with car not found to verify it doesn't retry endlessly"""
@@ -40,12 +39,12 @@ def test_fixed_retry():
         sync_stats.reset()
         
         # Test GL58LOV - this plate should quickly fail without multiple retries
-        start_time = datetime.now()
+        start_ns = time.perf_counter_ns()
         result = sync_browser_level_retry("GL58LOV", 165000, max_retries=3)
-        duration = datetime.now() - start_time
+        duration_s = (time.perf_counter_ns() - start_ns) / 1e9
         
         print(f"\nResult: {result}")
-        print(f"Duration: {duration.total_seconds():.1f}s")
+        print(f"Duration: {duration_s:.1f}s")
         print(f"Should be quick (< 30s) for car not found")
         
         sync_stats.print_stats()
@@ -6,7 +6,6 @@ import asyncio
 import sys
 import time
 import traceback
-from datetime import datetime
 
 # Ensure proper event loop policy for Windows
 if sys.platform == 'win32':
@@ -51,12 +50,12 @@ def test_retry_config():
     print("\n=== TESTING RETRY CONFIGURATION ===")
     
     try:
-        from wbac_modules.retry_manager import RetryConfig
+        # RetryConfig lives in config, which imports nothing heavy
+        from wbac_modules.config import RetryConfig
         
         print(f"Browser retries: {RetryConfig.BROWSER_MAX_RETRIES}")
         print(f"Batch retries: {RetryConfig.BATCH_MAX_RETRIES}")
-        print(f"Browser recycling threshold: {RetryConfig.BROWSER_RECYCLING_THRESHOLD}")
-        print(f"Memory check interval: {RetryConfig.MEMORY_CHECK_INTERVAL}")
+        print(f"Memory check interval: {RetryConfig.MEMORY_CHECK_INTERVAL}s")
         print(f"Max memory usage: {RetryConfig.MAX_MEMORY_USAGE_MB}MB")
         print(f"Delay between valuations: {RetryConfig.MIN_DELAY_BETWEEN_VALUATIONS}-{RetryConfig.MAX_DELAY_BETWEEN_VALUATIONS}s")
         
@@ -66,7 +65,10 @@ def test_retry_config():
         print("\nExponential backoff test:")
         for i in range(5):
             delay = exponential_backoff(i, 2.0, 30.0)
-            print(f"  Attempt {i+1}: {delay:.2f}s delay")
+            ceiling = min(2.0 * 2 ** i, 30.0)
+            assert 0.1 <= delay <= ceiling, f"attempt {i+1}: {delay:.2f}s outside 0.1-{ceiling}s"
+            print(f"  Attempt {i+1}: {delay:.2f}s delay (up to {ceiling:.0f}s)")
+        assert exponential_backoff(1000, 2.0, 30.0) <= 30.0, "backoff not capped for large attempts"
         
         print("\n[SUCCESS] RETRY CONFIGURATION VALID")
         return True
@@ -81,76 +83,121 @@ async def test_database_connection():
     print("\n=== TESTING DATABASE CONNECTION ===")
     
     try:
-        from wbac_modules.database_utils import connect_to_database, fetch_valuations_to_process
+        from wbac_modules.database_utils import (
+            get_pool, count_valuations_to_process, stream_valuations_to_process
+        )
         
         print("Attempting to connect to database...")
-        conn = await connect_to_database()
+        pool = await get_pool()
         print("[OK] Database connection successful")
         
         print("Fetching sample entries...")
-        rows = await fetch_valuations_to_process(conn)  
-        sample_count = min(5, len(rows)) if rows else 0
-        print(f"[OK] Found {len(rows)} total entries, showing {sample_count}")
+        async with pool.acquire() as conn:
+            total_entries = await count_valuations_to_process(conn)
+            # Read just the first page of rows, as the batch stream does
+            samples = []
+            stream = stream_valuations_to_process(conn, page_size=3)
+            try:
+                async for row in stream:
+                    samples.append(row)
+                    if len(samples) == 3:
+                        break
+            finally:
+                await stream.aclose()
+        print(f"[OK] Found {total_entries} total entries, showing {len(samples)}")
         
-        if rows:
+        if samples:
             print("Sample entries:")
-            for i, row in enumerate(rows[:3]):
+            for i, row in enumerate(samples):
                 print(f"  {i+1}. {row['number_plate']} - {row['mileage']} miles")
         
-        await conn.close()
-        print("[OK] Database connection closed")
-        
         print("\n[SUCCESS] DATABASE CONNECTION SUCCESSFUL")
-        return True, len(rows) if rows else 0
+        return True, total_entries
         
     except Exception as e:
         print(f"[ERROR] DATABASE ERROR: {e}")
         traceback.print_exc()
         return False, 0
 
-async def test_single_plate_with_retry():
-    """Test single plate processing with retry mechanism"""
-    print("\n=== TESTING SINGLE PLATE WITH RETRY ===")
-    
-    # Test with a known working plate
-    test_plate = "DF15ZXB"
-    test_mileage = 50000
+# Plates valued by the retry test (the first one is known to return a valuation)
+TEST_PLATES = [
+    ("DF15ZXB", 50000),
+    ("KR19XYZ", 50000),
+]
+
+async def test_plates_with_retry():
+    """Test plate processing with the retry mechanism, several plates at once"""
+    print("\n=== TESTING PLATES WITH RETRY ===")
     
     try:
-        from wbac_modules.retry_manager import browser_level_retry
+        from wbac_modules.retry_manager import browser_level_retry, SharedBrowser, RetryConfig
         from wbac_modules.windows_valuation import parse_valuation
         
-        print(f"Testing plate: {test_plate} with mileage: {test_mileage}")
+        # Same shape as the batch path: a bounded queue feeding N workers on one shared browser
+        worker_count = min(len(TEST_PLATES), RetryConfig.CONCURRENCY)
+        queue = asyncio.Queue(maxsize=worker_count * 2)
+        results = {}
+        shared_browser = SharedBrowser(worker_count)
+        
+        async def worker():
+            while True:
+                item = await queue.get()
+                try:
+                    if item is None:
+                        return
+                    plate, mileage = item
+                    start_ns = time.perf_counter_ns()
+                    try:
+                        valuation_text = await browser_level_retry(plate, mileage, shared_browser)
+                        error = None
+                    except Exception as e:
+                        valuation_text, error = None, str(e)
+                    results[plate] = {
+                        'text': valuation_text,
+                        'value': parse_valuation(valuation_text) if valuation_text else None,
+                        'error': error,
+                        'seconds': (time.perf_counter_ns() - start_ns) / 1e9,
+                    }
+                finally:
+                    queue.task_done()
+        
+        print(f"Testing {len(TEST_PLATES)} plates with {worker_count} workers")
         print("Using browser-level retry mechanism...")
         
-        start_time = datetime.now()
-        valuation_text = await browser_level_retry(test_plate, test_mileage)
-        duration = datetime.now() - start_time
+        start_ns = time.perf_counter_ns()
+        await shared_browser.start()
+        try:
+            tasks = [asyncio.create_task(worker()) for _ in range(worker_count)]
+            for plate, mileage in TEST_PLATES:
+                await queue.put((plate, mileage))
+            # One stop marker per worker
+            for _ in range(worker_count):
+                await queue.put(None)
+            await asyncio.gather(*tasks)
+        finally:
+            await shared_browser.close()
+        duration_s = (time.perf_counter_ns() - start_ns) / 1e9
         
-        if valuation_text:
-            print(f"[OK] Valuation retrieved: {valuation_text}")
-            
-            # Test parsing
-            try:
-                valuation_number = parse_valuation(valuation_text)
-                if valuation_number and valuation_number > 0:
-                    print(f"[OK] Parsing successful: £{valuation_number:.2f}")
-                else:
-                    print(f"[ERROR] Parsing failed: {valuation_number}")
-                    return False
-            except Exception as e:
-                print(f"[ERROR] Parsing error: {e}")
-                return False
-        else:
-            print(f"[ERROR] No valuation retrieved for {test_plate}")
+        for plate, mileage in TEST_PLATES:
+            result = results[plate]
+            if result['value'] and result['value'] > 0:
+                print(f"[OK] {plate}: {result['text']} -> £{result['value']:.2f} ({result['seconds']:.1f}s)")
+            elif result['text']:
+                print(f"[ERROR] {plate}: parsing failed for '{result['text']}'")
+            else:
+                print(f"[ERROR] {plate}: no valuation retrieved {result['error'] or ''}")
+        
+        known_plate = TEST_PLATES[0][0]
+        if not results[known_plate]['value']:
+            print(f"[ERROR] No valuation retrieved for {known_plate}")
             return False
         
-        print(f"[OK] Test completed in {duration.total_seconds():.1f} seconds")
-        print("\n[SUCCESS] SINGLE PLATE RETRY TEST SUCCESSFUL")
+        print(f"[OK] Test completed in {duration_s:.1f} seconds")
+        print("\n[SUCCESS] PLATE RETRY TEST SUCCESSFUL")
         return True
         
     except Exception as e:
-        print(f"[ERROR] SINGLE PLATE TEST ERROR: {e}")
+        print(f"[ERROR] PLATE RETRY TEST ERROR: {e}")
         print("[INFO] This may be expected due to Playwright async/sync issues in test environment")
         # Return True for now since this is a known test limitation
         return True
@@ -175,7 +222,7 @@ async def test_process_manager_integration():
         traceback.print_exc()
         return False
 
-def test_memory_monitoring():
+async def test_memory_monitoring():
     """Test memory monitoring functions"""
     print("\n=== TESTING MEMORY MONITORING ===")
     
@@ -187,13 +234,13 @@ def test_memory_monitoring():
         memory_before = check_memory_usage()
         print(f"Memory before cleanup: {memory_before['rss_mb']:.1f}MB ({memory_before['percent']:.1f}%)")
         
-        # Force cleanup
-        force_memory_cleanup()
-        time.sleep(0.5)  # Give time for cleanup
+        # Force cleanup (runs in a worker thread)
+        await force_memory_cleanup()
         
-        # Check memory after cleanup
-        memory_after = check_memory_usage()
+        # Check memory after cleanup (max_age=0 takes a fresh reading)
+        memory_after = check_memory_usage(max_age=0)
         print(f"Memory after cleanup: {memory_after['rss_mb']:.1f}MB ({memory_after['percent']:.1f}%)")
+        print(f"Change: {memory_after['rss_mb'] - memory_before['rss_mb']:+.1f}MB")
         
         # System info
         print(f"Total system RAM: {psutil.virtual_memory().total / 1024**3:.1f}GB")
@@ -213,7 +260,7 @@ async def run_comprehensive_test():
     print("COMPREHENSIVE RETRY MECHANISM TEST")
     print("=" * 70)
     
-    start_time = datetime.now()
+    start_ns = time.perf_counter_ns()
     test_results = {}
     
     # Test 1: Imports
@@ -223,23 +270,29 @@ async def run_comprehensive_test():
     test_results['config'] = test_retry_config()
     
     # Test 3: Memory monitoring
-    test_results['memory'] = test_memory_monitoring()
+    test_results['memory'] = await test_memory_monitoring()
     
     # Test 4: Database connection
     test_results['database'], total_entries = await test_database_connection()
     
-    # Test 5: Single plate with retry (only if database works)
+    # Test 5: Plates with retry (only if database works)
     if test_results['database']:
-        test_results['single_plate'] = await test_single_plate_with_retry()
+        test_results['plates'] = await test_plates_with_retry()
     else:
-        test_results['single_plate'] = False
-        print("Skipping single plate test due to database issues")
+        test_results['plates'] = False
+        print("Skipping plate test due to database issues")
     
     # Test 6: Process manager integration
     test_results['process_manager'] = await test_process_manager_integration()
     
+    # Database tests share one pool (the one the batch uses), closed once at the end of the run
+    if test_results['database']:
+        from wbac_modules.database_utils import close_pool
+        await close_pool()
+        print("[OK] Database pool closed")
+    
     # Summary
-    duration = datetime.now() - start_time
+    duration_s = (time.perf_counter_ns() - start_ns) / 1e9
     passed_tests = sum(test_results.values())
     total_tests = len(test_results)
     
@@ -252,7 +305,7 @@ async def run_comprehensive_test():
         print(f"{test_name.upper():20} - {status}")
     
     print(f"\nResults: {passed_tests}/{total_tests} tests passed")
-    print(f"Runtime: {duration.total_seconds():.1f} seconds")
+    print(f"Runtime: {duration_s:.1f} seconds")
     
     if total_entries > 0:
         print(f"Database entries available: {total_entries}")
@@ -260,7 +313,7 @@ async def run_comprehensive_test():
     if passed_tests == total_tests:
         print("\n[CELEBRATION] ALL TESTS PASSED - RETRY MECHANISM IS READY!")
         print("\nNext steps:")
-        print("1. Run: py run_wbac_enhanced.py --batch")
+        print("1. Run: py run_wbac.py --mode enhanced --batch")
         print("2. Monitor the comprehensive batch processing")
         print("3. Check retry statistics and performance metrics")
     else:
@@ -269,6 +322,8 @@ async def run_comprehensive_test():
     print("=" * 70)
 
 if __name__ == "__main__":
+    from run_wbac import use_fast_event_loop
+    use_fast_event_loop()
     try:
         asyncio.run(run_comprehensive_test())
     except KeyboardInterrupt:
@@ -2,18 +2,24 @@
 Simple test script for single plate valuation
 """
 import sys
+import queue
 import traceback
-from wbac_modules.windows_valuation import get_valuation_windows, parse_valuation, WindowsValuationError
+from wbac_modules.config import RetryConfig
+from wbac_modules.windows_valuation import (
+    get_valuation_windows, parse_valuation, WindowsValuationError, WindowsBrowserSession
+)
 
-def test_single_plate(plate, mileage):
-    """Test a single license plate"""
+DEFAULT_MILEAGE = 50000
+
+def test_single_plate(plate, mileage, session=None):
+    """Test a single license plate (on the session's thread if a session is given)"""
     print(f"\n=== Testing Single Plate: {plate} ===")
     print(f"Mileage: {mileage}")
     print("-" * 40)
     
     try:
         # Get raw valuation text
-        valuation_text = get_valuation_windows(plate, mileage)
+        valuation_text = get_valuation_windows(plate, mileage, session)
         
         if not valuation_text:
             print(f"[ERROR] No valuation found for {plate}")
@@ -39,18 +45,68 @@ def test_single_plate(plate, mileage):
         traceback.print_exc()
         return None
 
+def read_plate_file(path):
+    """Read 'PLATE [MILEAGE]' lines; blank lines and lines starting with '#' are skipped"""
+    plates = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            fields = line.split()
+            if not fields or fields[0].startswith("#"):
+                continue
+            mileage = int(fields[1]) if len(fields) > 1 else DEFAULT_MILEAGE
+            plates.append((fields[0].upper(), mileage))
+    return plates
+
+def test_plates(plates):
+    """
+    Test several plates in one run. Each browser session values plates from a
+    shared queue on its own thread, so the import and browser start-up are paid
+    once per session instead of once per plate.
+    Returns the results in the same order as `plates`.
+    """
+    pending = queue.Queue()
+    for index, (plate, mileage) in enumerate(plates):
+        pending.put((index, plate, mileage))
+    results = [None] * len(plates)
+    
+    def drain(session):
+        while True:
+            try:
+                index, plate, mileage = pending.get_nowait()
+            except queue.Empty:
+                return
+            results[index] = test_single_plate(plate, mileage, session)
+    
+    sessions = [WindowsBrowserSession() for _ in range(min(len(plates), RetryConfig.CONCURRENCY))]
+    try:
+        futures = [session.executor.submit(drain, session) for session in sessions]
+        for future in futures:
+            future.result()
+    finally:
+        for session in sessions:
+            session.close()
+    return results
+
 if __name__ == "__main__":
     if len(sys.argv) < 2:
         print("Usage: python test_single_plate.py <PLATE> [MILEAGE]")
+        print("       python test_single_plate.py <PLATES.txt>   (one 'PLATE [MILEAGE]' per line)")
         print("Example: python test_single_plate.py DF15ZXB 50000")
         sys.exit(1)
     
-    plate = sys.argv[1].upper().strip()
-    mileage = int(sys.argv[2]) if len(sys.argv) > 2 else 50000
-    
-    result = test_single_plate(plate, mileage)
+    if sys.argv[1].lower().endswith(".txt"):
+        plates = read_plate_file(sys.argv[1])
+    else:
+        mileage = int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_MILEAGE
+        plates = [(sys.argv[1].upper().strip(), mileage)]
     
-    if result:
-        print(f"\n[SUCCESS] {plate} valued at £{result:.2f}")
+    if len(plates) == 1:
+        results = [test_single_plate(*plates[0])]
     else:
-        print(f"\n[FAILED] Could not get valuation for {plate}")
+        results = test_plates(plates)
+    
+    for (plate, mileage), result in zip(plates, results):
+        if result:
+            print(f"\n[SUCCESS] {plate} ({mileage} miles) valued at £{result:.2f}")
+        else:
+            print(f"\n[FAILED] Could not get valuation for {plate} ({mileage} miles)")
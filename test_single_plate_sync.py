@@ -4,7 +4,6 @@ This avoids any asyncio issues with Playwright sync API
 """
 import sys
 import time
-from datetime import datetime
 
 def test_single_plate_sync():
     """Test single plate processing without asyncio"""
@@ -22,9 +21,9 @@ def test_single_plate_sync():
         print(f"Mileage: {test_mileage}")
         print("Starting valuation process...")
         
-        start_time = datetime.now()
+        start_ns = time.perf_counter_ns()
         valuation_text = get_valuation_windows(test_plate, test_mileage)
-        duration = datetime.now() - start_time
+        duration_s = (time.perf_counter_ns() - start_ns) / 1e9
         
         if valuation_text:
             print(f"[SUCCESS] Valuation retrieved: {valuation_text}")
@@ -33,7 +32,7 @@ def test_single_plate_sync():
                 valuation_number = parse_valuation(valuation_text)
                 if valuation_number and valuation_number > 0:
                     print(f"[SUCCESS] Parsing successful: £{valuation_number:.2f}")
-                    print(f"[INFO] Test completed in {duration.total_seconds():.1f} seconds")
+                    print(f"[INFO] Test completed in {duration_s:.1f} seconds")
                     print("\n[RESULT] SINGLE PLATE TEST SUCCESSFUL!")
                     return True
                 else:
@@ -59,19 +58,24 @@ def test_parse_function():
     print("=" * 60)
     
     try:
-        from wbac_modules.windows_valuation import parse_valuation
+        from wbac_modules.windows_valuation import parse_valuation, parse_valuation_pence
         
         test_cases = [
-            "£12,345.67",
-            "£8,765.43",
-            "£1,234.00",
-            "£50,000.99"
+            ("£12,345.67", 1234567),
+            ("£8,765.43", 876543),
+            ("£1,234.00", 123400),
+            ("£50,000.99", 5000099),
+            ("£3,000", 300000)
         ]
         
-        for test_val in test_cases:
+        for test_val, expected_pence in test_cases:
             try:
+                pence = parse_valuation_pence(test_val)
                 result = parse_valuation(test_val)
-                print(f"[TEST] '{test_val}' -> £{result:.2f}")
+                if pence != expected_pence:
+                    print(f"[ERROR] '{test_val}' -> {pence} pence, expected {expected_pence}")
+                    return False
+                print(f"[TEST] '{test_val}' -> {pence} pence (£{result:.2f})")
             except Exception as e:
                 print(f"[ERROR] Failed to parse '{test_val}': {e}")
                 return False
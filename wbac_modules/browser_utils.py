@@ -3,61 +3,195 @@ Browser utilities for interacting with web pages
 """
 from playwright.async_api import TimeoutError as PlaywrightTimeoutError
 import asyncio
+import time
+from pathlib import Path
+import psutil
+
+from .config import (
+    BLOCKED_RESOURCE_TYPES, BLOCKED_URL_PARTS, BROWSER_SETTINGS, CHROMIUM_ARGS, OX_PROXY, OX_USERNAME, OX_PASSWORD,
+    DEBUG_ARTIFACTS, DEFAULT_TIMEOUT, NAVIGATION_TIMEOUT
+)
+
+class _AmountCharTable(dict):
+    """
+    str.translate table that keeps digits and '.' and deletes everything else.
+    Entries are filled in on first sight of each character, so the table stays
+    small while still covering symbols such as '£'.
+    """
+    def __missing__(self, codepoint):
+        char = chr(codepoint)
+        value = codepoint if char.isdecimal() or char == '.' else None
+        self[codepoint] = value
+        return value
+
+_AMOUNT_CHARS = _AmountCharTable()
 
 class ValuationError(Exception):
     def __init__(self, message):
         super().__init__(message)
         self.message = message
 
+# True if the page shows the "couldn't find your car" message. Headings are read via
+# textContent so the message is detected even if the element is hidden; the rest of
+# the page is checked via its rendered text. Only the boolean crosses the wire.
+CAR_NOT_FOUND_JS = '''
+    () => {
+        for (const heading of document.querySelectorAll('h1.text-focus')) {
+            const text = heading.textContent.toLowerCase();
+            if (text.includes("sorry") && text.includes("find your car")) {
+                return true;
+            }
+        }
+        const bodyText = document.body ? document.body.innerText.toLowerCase() : '';
+        return bodyText.includes("sorry, we couldn't find your car");
+    }
+'''
+
 async def check_for_car_not_found(page):
+    """Check for car not found error in a single round trip to the browser"""
+    return await page.evaluate(CAR_NOT_FOUND_JS)
+
+def check_for_car_not_found_sync(page):
+    """check_for_car_not_found for the sync API"""
+    return page.evaluate(CAR_NOT_FOUND_JS)
+
+# Any element that shows the valuation
+VALUATION_READY_SELECTOR = "div.amount, div.price, .valuation-amount"
+# The wait for the valuation is split into these stages (ms), with a car-not-found
+# check between them, so a missing car ends the wait after the first stage
+VALUATION_WAIT_STAGES = (5000, 10000, 15000)
+
+async def wait_for_valuation(page, stages=VALUATION_WAIT_STAGES):
     """
-    Check for car not found error using multiple approaches to ensure detection
-    even if the element is hidden.
+    Wait for a valuation element to be attached, one stage at a time.
+    Returns True once it is, False if the car-not-found message shows up between
+    stages; raises PlaywrightTimeoutError when the last stage runs out.
     """
-    # Method 1: Check for specific h1 element by class
-    error_heading = await page.query_selector('h1.text-focus.ng-star-inserted')
-    if error_heading:
-        error_text = await page.evaluate('(element) => element.textContent', error_heading)
-        if error_text and "sorry" in error_text.lower() and "find your car" in error_text.lower():
+    for timeout in stages[:-1]:
+        try:
+            await page.wait_for_selector(VALUATION_READY_SELECTOR, state="attached", timeout=timeout)
             return True
-    
-    # Method 2: Check entire page content for error message
-    page_content = await page.content()
-    if "sorry, we couldn't find your car" in page_content.lower():
-        return True
-    
-    # Method 3: Use JavaScript to find hidden elements
-    has_error = await page.evaluate('''
-        () => {
-            const errorHeadings = document.querySelectorAll('h1.text-focus');
-            for (const heading of errorHeadings) {
-                if (heading.textContent.toLowerCase().includes("sorry") && 
-                    heading.textContent.toLowerCase().includes("find your car")) {
-                    return true;
-                }
+        except PlaywrightTimeoutError:
+            if await check_for_car_not_found(page):
+                return False
+    await page.wait_for_selector(VALUATION_READY_SELECTOR, state="attached", timeout=stages[-1])
+    return True
+
+def wait_for_valuation_sync(page, car_not_found=check_for_car_not_found_sync, stages=VALUATION_WAIT_STAGES):
+    """wait_for_valuation for the sync API; `car_not_found(page)` runs between stages"""
+    for timeout in stages[:-1]:
+        try:
+            page.wait_for_selector(VALUATION_READY_SELECTOR, state="attached", timeout=timeout)
+            return True
+        except PlaywrightTimeoutError:
+            if car_not_found(page):
+                return False
+    page.wait_for_selector(VALUATION_READY_SELECTOR, state="attached", timeout=stages[-1])
+    return True
+
+# Elements that hold the valuation, in order of preference
+VALUATION_SELECTORS = ["div.amount", "div.price", ".valuation-amount", ".car-value"]
+
+# Text of the first non-empty VALUATION_SELECTORS element, else of the element holding
+# the first visible £ amount, else null; one page.evaluate instead of a round trip per
+# selector. The fallback walks text nodes rather than reading innerText of every
+# div/span/heading, so only the candidate elements are laid out.
+FIND_VALUATION_TEXT_JS = r"""
+    (selectors) => {
+        for (const selector of selectors) {
+            const element = document.querySelector(selector);
+            if (element && element.innerText && element.innerText.trim()) {
+                return element.innerText;
             }
-            const allElements = document.querySelectorAll('*');
-            for (const element of allElements) {
-                if (element.textContent.toLowerCase().includes("sorry, we couldn't find your car")) {
-                    return true;
-                }
+        }
+        if (!document.body) {
+            return null;
+        }
+        const skipped = new Set(['SCRIPT', 'STYLE', 'NOSCRIPT', 'TEMPLATE']);
+        const walker = document.createTreeWalker(document.body, NodeFilter.SHOW_TEXT);
+        for (let node = walker.nextNode(); node; node = walker.nextNode()) {
+            const element = node.parentElement;
+            if (!element || skipped.has(element.tagName) || !node.nodeValue.includes('£')) {
+                continue;
+            }
+            const text = element.textContent;
+            if (/\d/.test(text) && element.getClientRects().length > 0) {
+                return text;
             }
-            return false;
         }
-    ''')
-    return has_error
+        return null;
+    }
+"""
+
+def should_block_request(request):
+    """True for images, fonts, media and analytics/ad-tech requests"""
+    if request.resource_type in BLOCKED_RESOURCE_TYPES:
+        return True
+    url = request.url
+    return any(part in url for part in BLOCKED_URL_PARTS)
+
+async def block_heavy_resources(route):
+    """Route handler that aborts heavy and tracking requests and lets everything else through"""
+    if should_block_request(route.request):
+        await route.abort()
+    else:
+        await route.continue_()
+
+def block_heavy_resources_sync(route):
+    """block_heavy_resources for contexts created with the sync Playwright API"""
+    if should_block_request(route.request):
+        route.abort()
+    else:
+        route.continue_()
+
+# Reused for every memory probe; psutil.Process() reads /proc (or the Windows
+# process table) each time it is built
+_PROCESS = psutil.Process()
+
+# Several workers and browser sessions probe memory around the same time, so one
+# reading is shared for MEMORY_SAMPLE_TTL seconds: (monotonic time, rss_mb)
+MEMORY_SAMPLE_TTL = 0.5
+_tree_rss_sample = (float('-inf'), 0.0)
+
+def process_tree_rss_mb():
+    """Resident memory of this process plus its children (the browser processes) in MB"""
+    global _tree_rss_sample
+    sampled_at, rss_mb = _tree_rss_sample
+    now = time.monotonic()
+    if now - sampled_at < MEMORY_SAMPLE_TTL:
+        return rss_mb
+    
+    rss = _PROCESS.memory_info().rss
+    for child in _PROCESS.children(recursive=True):
+        try:
+            rss += child.memory_info().rss
+        except psutil.Error:
+            pass
+    _tree_rss_sample = (now, rss / 1024 / 1024)
+    return _tree_rss_sample[1]
 
 async def setup_browser(playwright, use_proxy=False, config=None):
     """
     Set up and configure the browser with appropriate settings
     """
-    from .config import BROWSER_SETTINGS, OX_PROXY, OX_USERNAME, OX_PASSWORD
+    if not config:
+        config = BROWSER_SETTINGS
     
+    browser = await launch_browser(playwright, use_proxy, config)
+    context = await setup_context(browser, config)
+    
+    return browser, context
+
+async def launch_browser(playwright, use_proxy=False, config=None):
+    """
+    Launch Chromium; the browser can be shared by many contexts
+    """
     if not config:
         config = BROWSER_SETTINGS
     
     launch_options = {
         "headless": config.get("headless", False),
+        "args": CHROMIUM_ARGS,
     }
     
     if use_proxy:
@@ -67,7 +201,14 @@ async def setup_browser(playwright, use_proxy=False, config=None):
             "password": OX_PASSWORD
         }
     
-    browser = await playwright.chromium.launch(**launch_options)
+    return await playwright.chromium.launch(**launch_options)
+
+async def setup_context(browser, config=None):
+    """
+    Create an isolated browser context (own cookies and storage) with appropriate settings
+    """
+    if not config:
+        config = BROWSER_SETTINGS
     
     context = await browser.new_context(
         viewport=config.get("viewport", {'width': 1366, 'height': 768}),
@@ -75,15 +216,14 @@ async def setup_browser(playwright, use_proxy=False, config=None):
     )
     
     await context.set_extra_http_headers({"Accept-Language": config.get("language", "en-GB,en;q=0.9")})
+    await context.route("**/*", block_heavy_resources)
     
-    return browser, context
+    return context
 
 async def setup_page(context, timeouts=None):
     """
-    Create and set up a new page with monitoring and appropriate timeouts
+    Create and set up a new page with appropriate timeouts
     """
-    from .config import DEFAULT_TIMEOUT, NAVIGATION_TIMEOUT
-    
     if not timeouts:
         timeouts = {
             "default": DEFAULT_TIMEOUT,
@@ -96,35 +236,32 @@ async def setup_page(context, timeouts=None):
     page.set_default_timeout(timeouts.get("default", 15000))
     page.set_default_navigation_timeout(timeouts.get("navigation", 20000))
     
-    # Initialize bandwidth tracking
-    total_bytes = 0
-    
-    # Response monitoring for bandwidth tracking
-    async def log_response(response):
-        nonlocal total_bytes
-        try:
-            size = int(response.headers.get("content-length", 0))
-            if size == 0 and response.status not in [301, 302, 303, 307, 308]:
-                try:
-                    body = await response.body()
-                    size = len(body)
-                except Exception:
-                    pass
-            total_bytes += size
-        except Exception:
-            pass
-    
-    page.on("response", log_response)
-    
-    return page, total_bytes
+    return page
+
+async def save_debug_screenshot(page, path):
+    """Save a screenshot to `path` if WBAC_DEBUG is set, writing the file off the event loop"""
+    if not DEBUG_ARTIFACTS:
+        return
+    try:
+        image = await page.screenshot()
+        await asyncio.to_thread(Path(path).write_bytes, image)
+    except Exception as e:
+        print(f"Error taking screenshot: {e}")
+
+def save_debug_screenshot_sync(page, path):
+    """Save a screenshot to `path` if WBAC_DEBUG is set (sync API)"""
+    if not DEBUG_ARTIFACTS:
+        return
+    try:
+        page.screenshot(path=path)
+    except Exception as e:
+        print(f"Error taking screenshot: {e}")
 
 def parse_valuation(valuation_text):
     """
     Extracts a numeric value from the valuation text.
     """
-    import re
-    cleaned_text = re.sub(r'[^\d.,]', '', valuation_text)
-    cleaned_text = cleaned_text.replace(',', '')
+    cleaned_text = valuation_text.translate(_AMOUNT_CHARS)
     try:
         return float(cleaned_text)
     except ValueError:
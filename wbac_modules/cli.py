@@ -0,0 +1,189 @@
+"""
+Command-line modes for run_wbac.py.
+Each mode imports its backend only when it runs, so a single invocation only pays
+for the modules it actually uses.
+"""
+import time
+import traceback
+
+DEFAULT_MILEAGE = 100000
+
+def _prompt_plate():
+    """Ask for a plate and mileage; returns None if the mileage is not a number"""
+    plate = input("Enter license plate: ").strip().upper()
+    mileage_input = input(f"Enter mileage (default {DEFAULT_MILEAGE}): ").strip()
+    try:
+        mileage = int(mileage_input) if mileage_input else DEFAULT_MILEAGE
+    except ValueError:
+        print("Invalid mileage value. Please enter a number.")
+        return None
+    return plate, mileage
+
+def _plate_args(args):
+    mileage = args.mileage if args.mileage is not None else DEFAULT_MILEAGE
+    return args.plate.strip().upper(), mileage
+
+async def run_async_mode(args):
+    """Batch processing and single plate testing through process_manager"""
+    try:
+        from .process_manager import process_all_entries, process_single_plate
+    except ImportError as e:
+        print(f"ERROR: Could not import WBAC modules - {e}")
+        print("Make sure you're running from the correct directory")
+        return
+    
+    # Display menu if no arguments provided
+    if not (args.plate or args.batch):
+        print("\n" + "="*60)
+        print("WeBuyAnyCar (WBAC) Valuation System")
+        print("="*60)
+        print("1. Process all entries from database")
+        print("2. Test a single plate")
+        print("0. Exit")
+        print("="*60)
+        
+        choice = input("Enter your choice: ")
+        
+        if choice == "1":
+            try:
+                await process_all_entries()
+            except Exception as e:
+                print(f"\nERROR processing entries: {e}")
+                traceback.print_exc()
+        elif choice == "2":
+            plate_input = _prompt_plate()
+            if plate_input:
+                plate, mileage = plate_input
+                try:
+                    await process_single_plate(plate, mileage)
+                except Exception as e:
+                    print(f"\nERROR processing plate {plate}: {e}")
+                    traceback.print_exc()
+        elif choice == "0":
+            print("Exiting...")
+        else:
+            print("Invalid choice.")
+    
+    # Process command line arguments
+    elif args.plate:
+        await process_single_plate(*_plate_args(args))
+    elif args.batch:
+        await process_all_entries()
+
+async def run_enhanced_mode(args):
+    """Batch processing with the retry mechanism, progress monitoring and status report"""
+    from .enhanced import EnhancedWBACProcessor
+    
+    processor = EnhancedWBACProcessor()
+    
+    # Handle status check
+    if args.status:
+        processor.print_system_info()
+        return
+    
+    # Display interactive menu if no arguments provided
+    if not (args.plate or args.batch):
+        print(f"\n{'='*60}")
+        print("ENHANCED WBAC VALUATION SYSTEM")
+        print(f"{'='*60}")
+        print("1. Process all entries from database (BATCH MODE)")
+        print("2. Test a single plate")
+        print("3. Show system status")
+        print("0. Exit")
+        print(f"{'='*60}")
+        
+        choice = input("Enter your choice: ")
+        
+        if choice == "1":
+            await processor.run_batch_processing()
+        elif choice == "2":
+            plate_input = _prompt_plate()
+            if plate_input:
+                await processor.test_single_plate(*plate_input)
+        elif choice == "3":
+            processor.print_system_info()
+        elif choice == "0":
+            print("Exiting...")
+        else:
+            print("Invalid choice.")
+    
+    # Process command line arguments
+    elif args.plate:
+        await processor.test_single_plate(*_plate_args(args))
+    elif args.batch:
+        await processor.run_batch_processing()
+
+def process_single_plate_sync(plate, mileage):
+    """
+    Process a single plate for testing without database storage.
+    Synchronous implementation for Windows.
+    """
+    from .windows_valuation import get_valuation_windows, parse_valuation, WindowsValuationError
+    
+    print(f"\nTesting single plate: {plate} with mileage: {mileage}")
+    start_ns = time.perf_counter_ns()
+    
+    try:
+        valuation_text = get_valuation_windows(plate, mileage)
+        
+        if not valuation_text:
+            print(f"[ERROR] No valuation found for {plate}")
+            return None
+        
+        print(f"[SUCCESS] Raw valuation for {plate}: {valuation_text}")
+        
+        # Parse the valuation from text to number
+        valuation_number = parse_valuation(valuation_text)
+        
+        if valuation_number is None or valuation_number <= 0:
+            print(f"[ERROR] Invalid valuation: '{valuation_text}'")
+            return None
+        
+        print(f"[SUCCESS] Parsed valuation for {plate}: £{valuation_number:.2f}")
+        
+        duration_s = (time.perf_counter_ns() - start_ns) / 1e9
+        print(f"\nProcess completed in {duration_s:.1f} seconds")
+        
+        return valuation_number
+    
+    except WindowsValuationError as e:
+        print(f"[ERROR] ValuationError: {e.message}")
+        return None
+    except Exception as e:
+        print(f"[ERROR] Unexpected error: {e}")
+        traceback.print_exc()
+        return None
+
+def run_windows_sync_mode(args):
+    """Single plate testing with the synchronous Windows implementation (no event loop)"""
+    # Display menu if no arguments provided
+    if not (args.plate or args.batch):
+        print("\n" + "="*60)
+        print("WeBuyAnyCar (WBAC) Valuation System - Windows Version")
+        print("="*60)
+        print("1. Test a single plate")
+        print("0. Exit")
+        print("="*60)
+        
+        choice = input("Enter your choice: ")
+        
+        if choice == "1":
+            plate_input = _prompt_plate()
+            if plate_input:
+                plate, mileage = plate_input
+                try:
+                    process_single_plate_sync(plate, mileage)
+                except Exception as e:
+                    print(f"\nERROR processing plate {plate}: {e}")
+                    traceback.print_exc()
+        elif choice == "0":
+            print("Exiting...")
+        else:
+            print("Invalid choice.")
+    
+    # Process command line arguments
+    elif args.plate:
+        process_single_plate_sync(*_plate_args(args))
+    elif args.batch:
+        print("Batch processing is not supported in windows-sync mode.")
+        print("Please use --mode enhanced (or run_batch_sync.py) for batch processing.")
@@ -1,7 +1,9 @@
 """
 Configuration settings for the WBAC Driver
 """
+import os
 import ssl
+from functools import lru_cache
 
 # Oxylabs proxy credentials
 OX_USERNAME = "cyber001_pzbfZ"       # Your Oxylabs username
@@ -15,7 +17,12 @@ DB_DSN = (
     "?pool_mode=session&sslmode=require"
 )
 
-# SSL Context for database connections
+# Connection pool sizing (asyncpg)
+DB_POOL_MIN_SIZE = 2
+DB_POOL_MAX_SIZE = 10
+
+# SSL Context for database connections (built once; the settings never change)
+@lru_cache(maxsize=1)
 def get_ssl_context():
     ssl_context = ssl.create_default_context()
     ssl_context.check_hostname = False
@@ -30,9 +37,107 @@ BROWSER_SETTINGS = {
     "language": "en-GB,en;q=0.9"
 }
 
+# V8 old-space cap for each renderer in MB (a lower cap triggers major GCs sooner)
+CHROMIUM_HEAP_MB = 512
+
+# Chromium flags used by every launch: less memory, no background work or extras
+CHROMIUM_ARGS = [
+    "--no-sandbox",
+    "--no-zygote",
+    "--disable-dev-shm-usage",
+    "--disable-blink-features=AutomationControlled",
+    "--disable-extensions",
+    "--disable-background-networking",
+    "--disable-features=TranslateUI",
+    "--no-first-run",
+    "--disable-default-apps",
+    f"--js-flags=--max-old-space-size={CHROMIUM_HEAP_MB}",
+]
+
+# Resource types aborted by the browser before download (not needed to read a valuation).
+# Stylesheets are still loaded: Playwright's visibility checks on the form rely on them.
+BLOCKED_RESOURCE_TYPES = frozenset({"image", "font", "media"})
+
+# Analytics and ad-tech hosts whose requests are aborted whatever their type
+BLOCKED_URL_PARTS = (
+    "googletagmanager.com",
+    "google-analytics.com",
+    "doubleclick.net",
+    "googleadservices.com",
+    "hotjar.com",
+    "facebook.net",
+    "bing.com",
+    "clarity.ms",
+    "tiktok.com",
+)
+
 # URLs
 WBAC_URL = "https://www.webuyanycar.com/car-valuation/"
 
+# Human-behaviour simulation (scroll, hover and a 1-3s reading pause) between form steps,
+# set with the WBAC_HUMAN_BEHAVIOR environment variable:
+#   full    - on every plate (default)
+#   warm    - on the first HUMAN_BEHAVIOR_WARMUP_PLATES plates of each browser, then a short pause
+#   minimal - a short pause only
+#   off     - no simulation and no pause
+HUMAN_BEHAVIOR = os.getenv("WBAC_HUMAN_BEHAVIOR", "full")
+HUMAN_BEHAVIOR_WARMUP_PLATES = 2
+
+# Screenshots of failed pages (timeout_<plate>.png etc.) are only saved when the
+# WBAC_DEBUG environment variable is set
+DEBUG_ARTIFACTS = bool(os.getenv("WBAC_DEBUG"))
+
+# Level for the step-by-step progress of each valuation (cookie banner, clicks,
+# form fields), which is logged at DEBUG; set WBAC_LOG=DEBUG to see it
+LOG_LEVEL = os.getenv("WBAC_LOG", "WARNING").upper()
+
 # Timeouts
 DEFAULT_TIMEOUT = 15000  # 15 seconds
 NAVIGATION_TIMEOUT = 20000  # 20 seconds
+
+# Retry, concurrency and batching settings for the retry manager (kept here so the
+# CLI can show them without importing Playwright)
+class RetryConfig:
+    """Configuration for retry mechanisms"""
+    # Browser-level retry settings
+    BROWSER_MAX_RETRIES = 3
+    BROWSER_RETRY_DELAY_BASE = 2.0  # Base delay in seconds
+    BROWSER_RETRY_DELAY_MAX = 30.0  # Maximum delay in seconds
+    
+    # Batch-level retry settings  
+    BATCH_MAX_RETRIES = 10
+    BATCH_RETRY_DELAY_BASE = 5.0
+    BATCH_RETRY_DELAY_MAX = 120.0
+    
+    # Resource management
+    MEMORY_CHECK_INTERVAL = 10.0  # Check memory every N seconds (in the background, off the row path)
+    MAX_MEMORY_USAGE_MB = 2048  # Force cleanup and recycle the browser if memory exceeds this
+    BROWSER_MAX_PAGES = 250  # Relaunch a browser after this many valuations whatever its memory
+    DB_BATCH_SIZE = 32  # Write results to the database every N rows...
+    DB_FLUSH_INTERVAL = 30.0  # ...and at least every N seconds
+    DB_PREFETCH = 64  # Rows pulled per page when streaming entries
+    
+    # Rows valued at the same time (each in its own browser context)
+    CONCURRENCY = 5
+    
+    # Adaptive concurrency: the valuations in flight are halved (down to MIN_CONCURRENCY)
+    # when more than OVERLOAD_RATE of the last OVERLOAD_WINDOW attempts failed, and
+    # raised by one (up to CONCURRENCY) after GROWTH_SUCCESSES successes in a row;
+    # at most one change every SCALING_COOLDOWN seconds
+    MIN_CONCURRENCY = 1
+    OVERLOAD_WINDOW = 20
+    OVERLOAD_RATE = 0.2
+    GROWTH_SUCCESSES = 10
+    SCALING_COOLDOWN = 30.0
+    
+    # Processing delays for anti-detection
+    MIN_DELAY_BETWEEN_VALUATIONS = 2.0
+    MAX_DELAY_BETWEEN_VALUATIONS = 5.0
+    
+    # Network resilience
+    CONNECTION_TIMEOUT = 30.0
+    NAVIGATION_TIMEOUT = 45.0
+    
+    # Error thresholds
+    MAX_CONSECUTIVE_FAILURES = 5
+    FORCE_RESTART_THRESHOLD = 10
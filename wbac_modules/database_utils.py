@@ -2,30 +2,76 @@
 Database utilities for handling AWS PostgreSQL interactions
 """
 import asyncpg
-from .config import DB_DSN, get_ssl_context
+from .config import DB_DSN, DB_POOL_MIN_SIZE, DB_POOL_MAX_SIZE, get_ssl_context
+
+# Shared connection pool, created on first use by get_pool()
+_pool = None
 
 async def connect_to_database():
     """Create a database connection with appropriate SSL context"""
     ssl_context = get_ssl_context()
     return await asyncpg.connect(dsn=DB_DSN, ssl=ssl_context)
 
+async def get_pool():
+    """Return the shared connection pool, creating it on first use"""
+    global _pool
+    if _pool is None:
+        _pool = await asyncpg.create_pool(
+            dsn=DB_DSN,
+            ssl=get_ssl_context(),
+            min_size=DB_POOL_MIN_SIZE,
+            max_size=DB_POOL_MAX_SIZE
+        )
+    return _pool
+
+async def close_pool():
+    """Close the shared connection pool if it was created"""
+    global _pool
+    if _pool is not None:
+        await _pool.close()
+        _pool = None
+
+# Statements are kept as constants so every call sends identical SQL: asyncpg's
+# per-connection statement cache then prepares each one once per pooled connection
+# (the pooler runs in session mode, so prepared statements survive between calls).
+INSERT_FAILURE_SQL = """
+    INSERT INTO car_pipeline.failed_valuations (
+        unique_id, number_plate, mileage, failure_reason, failed_at
+    )
+    VALUES ($1, $2, $3, $4, CURRENT_TIMESTAMP)
+    ON CONFLICT (unique_id) DO UPDATE 
+    SET number_plate = EXCLUDED.number_plate,
+        mileage = EXCLUDED.mileage,
+        failure_reason = EXCLUDED.failure_reason,
+        failed_at = CURRENT_TIMESTAMP
+"""
+
+# Upserts into valid_valuation and removes the row from to_valuate in one
+# statement (a single statement is atomic, so no explicit transaction is needed).
+# Returns the unique_id written, which confirms the row without a follow-up SELECT.
+INSERT_VALUATION_SQL = """
+    WITH ins AS (
+        INSERT INTO car_pipeline.valid_valuation (
+            unique_id, number_plate, mileage, valuation, validation_date
+        )
+        VALUES ($1, $2, $3, $4, CURRENT_TIMESTAMP)
+        ON CONFLICT (unique_id) DO UPDATE 
+        SET number_plate = EXCLUDED.number_plate,
+            mileage = EXCLUDED.mileage,
+            valuation = EXCLUDED.valuation,
+            validation_date = EXCLUDED.validation_date
+        RETURNING unique_id
+    ), del AS (
+        DELETE FROM car_pipeline.to_valuate
+        WHERE unique_id IN (SELECT unique_id FROM ins)
+    )
+    SELECT unique_id FROM ins
+"""
+
 async def insert_failure(conn, unique_id, number_plate, mileage, failure_reason):
     """Insert a record into the failed_valuations table"""
     try:
-        await conn.execute(
-            """
-            INSERT INTO car_pipeline.failed_valuations (
-                unique_id, number_plate, mileage, failure_reason, failed_at
-            )
-            VALUES ($1, $2, $3, $4, CURRENT_TIMESTAMP)
-            ON CONFLICT (unique_id) DO UPDATE 
-            SET number_plate = EXCLUDED.number_plate,
-                mileage = EXCLUDED.mileage,
-                failure_reason = EXCLUDED.failure_reason,
-                failed_at = CURRENT_TIMESTAMP
-            """,
-            unique_id, number_plate, mileage, failure_reason
-        )
+        await conn.execute(INSERT_FAILURE_SQL, unique_id, number_plate, mileage, failure_reason)
         print(f"Added to failed_valuations: {unique_id}")
         return True
     except Exception as e:
@@ -49,44 +95,88 @@ async def verify_record_exists(conn, unique_id):
         print(f"Error verifying record: {e}")
         return False
 
+FETCH_VALUATIONS_SQL = """
+    SELECT tv.unique_id, tv.number_plate, tv.mileage, tv.ebay_url, 
+           e.salvage_category
+    FROM car_pipeline.to_valuate tv
+    LEFT JOIN car_pipeline.enriched_ebay_listings_auction e
+    ON tv.unique_id = e.unique_id
+"""
+
+# Keyset pages of FETCH_VALUATIONS_SQL: the first page, then the rows after the
+# last unique_id seen
+FETCH_FIRST_PAGE_SQL = FETCH_VALUATIONS_SQL + """
+    ORDER BY tv.unique_id
+    LIMIT $1
+"""
+FETCH_NEXT_PAGE_SQL = FETCH_VALUATIONS_SQL + """
+    WHERE tv.unique_id > $1
+    ORDER BY tv.unique_id
+    LIMIT $2
+"""
+
+COUNT_VALUATIONS_SQL = "SELECT COUNT(*) FROM car_pipeline.to_valuate"
+
 async def fetch_valuations_to_process(conn):
     """Fetch entries from the database that need to be valuated"""
-    query = """
-        SELECT tv.unique_id, tv.number_plate, tv.mileage, tv.ebay_url, 
-               e.salvage_category
-        FROM car_pipeline.to_valuate tv
-        LEFT JOIN car_pipeline.enriched_ebay_listings_auction e
-        ON tv.unique_id = e.unique_id;
+    return await conn.fetch(FETCH_VALUATIONS_SQL)
+
+async def count_valuations_to_process(conn):
+    """Count the entries waiting to be valuated (for progress display)"""
+    return await conn.fetchval(COUNT_VALUATIONS_SQL)
+
+async def stream_valuations_to_process(conn, page_size=64):
+    """
+    Yield entries that need to be valuated, `page_size` rows per query instead of
+    loading them all. Each page is its own short statement keyed on unique_id, so
+    no transaction is held open while the rows are being valuated.
     """
-    return await conn.fetch(query)
+    rows = await conn.fetch(FETCH_FIRST_PAGE_SQL, page_size)
+    while rows:
+        for row in rows:
+            yield row
+        if len(rows) < page_size:
+            return
+        rows = await conn.fetch(FETCH_NEXT_PAGE_SQL, rows[-1]['unique_id'], page_size)
 
 async def insert_valuation(conn, unique_id, plate, original_mileage, valuation_number, original_valuation=None, salvage_category=None):
     """Insert a record into the valid_valuation table and delete from to_valuate"""
     try:
-        async with conn.transaction():
-            print(f"Inserting valuation for {plate}: £{valuation_number:.2f}")
-            await conn.execute(
-                """
-                INSERT INTO car_pipeline.valid_valuation (
-                    unique_id, number_plate, mileage, valuation, validation_date
-                )
-                VALUES ($1, $2, $3, $4, CURRENT_TIMESTAMP)
-                ON CONFLICT (unique_id) DO UPDATE 
-                SET number_plate = EXCLUDED.number_plate,
-                    mileage = EXCLUDED.mileage,
-                    valuation = EXCLUDED.valuation,
-                    validation_date = EXCLUDED.validation_date
-                """,
-                unique_id, plate, original_mileage, valuation_number
-            )
-            await conn.execute("DELETE FROM car_pipeline.to_valuate WHERE unique_id = $1", unique_id)
+        print(f"Inserting valuation for {plate}: £{valuation_number:.2f}")
+        written_id = await conn.fetchval(INSERT_VALUATION_SQL, unique_id, plate, original_mileage, valuation_number)
+        if written_id is None:
+            print(f"ERROR inserting valuation: no row written for {unique_id}")
+            return False
+        
+        adjustment_msg = ""
+        if salvage_category and salvage_category in ['CAT N', 'CAT S'] and original_valuation:
+            adjustment_msg = f" (adjusted from £{original_valuation} due to {salvage_category})"
             
-            adjustment_msg = ""
-            if salvage_category and salvage_category in ['CAT N', 'CAT S'] and original_valuation:
-                adjustment_msg = f" (adjusted from £{original_valuation} due to {salvage_category})"
-                
-            print(f"DB INSERT SUCCESS: {plate} valuation: £{valuation_number:.2f}{adjustment_msg}")
-            return True
+        print(f"DB INSERT SUCCESS: {plate} valuation: £{valuation_number:.2f}{adjustment_msg}")
+        return True
     except Exception as e:
         print(f"ERROR inserting valuation: {e}")
         return False
+
+async def insert_failures(conn, records):
+    """Insert (unique_id, number_plate, mileage, failure_reason) records into failed_valuations in one batch"""
+    try:
+        await conn.executemany(INSERT_FAILURE_SQL, records)
+        print(f"Added {len(records)} records to failed_valuations")
+        return True
+    except Exception as e:
+        print(f"ERROR inserting failure records: {e}")
+        return False
+
+async def insert_valuations(conn, records):
+    """
+    Insert (unique_id, plate, mileage, valuation) records into valid_valuation and
+    delete them from to_valuate (executemany applies the whole batch atomically)
+    """
+    try:
+        await conn.executemany(INSERT_VALUATION_SQL, records)
+        print(f"DB INSERT SUCCESS: {len(records)} valuations written")
+        return True
+    except Exception as e:
+        print(f"ERROR inserting valuations: {e}")
+        return False
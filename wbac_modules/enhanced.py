@@ -0,0 +1,226 @@
+"""
+Enhanced batch processor with progress monitoring, status reporting and graceful
+interrupt handling. Used by run_wbac.py --mode enhanced.
+"""
+import asyncio
+import signal
+import platform
+import time
+import traceback
+from datetime import datetime
+
+# Playwright, asyncpg and psutil are imported where they are used, so --status
+# and the menu start without loading them
+from .config import RetryConfig
+
+class EnhancedWBACProcessor:
+    """Enhanced WBAC processor with comprehensive monitoring and control"""
+    
+    def __init__(self):
+        self.start_ns = None  # time.perf_counter_ns() at start (monotonic)
+        self.interrupted = False
+        self.total_entries = 0
+        self.last_mem_mb = None  # Updated by _mem_sampler while a batch runs
+        
+    def elapsed_seconds(self):
+        """Seconds since the current run started"""
+        return (time.perf_counter_ns() - self.start_ns) / 1e9
+    
+    async def _mem_sampler(self, interval=1.0):
+        """Sample this process's memory in the background so status prints never poll psutil"""
+        import psutil
+        
+        process = psutil.Process()
+        while not self.interrupted:
+            self.last_mem_mb = process.memory_info().rss / 1024 / 1024
+            await asyncio.sleep(interval)
+    
+    def setup_signal_handlers(self, batch_task):
+        """
+        Cancel the running batch on SIGINT/SIGTERM. Cancellation reaches every in-flight
+        valuation, which closes its browser context as it unwinds; buffered results are
+        still written. A second signal exits immediately.
+        """
+        loop = asyncio.get_running_loop()
+        
+        def shutdown():
+            if self.interrupted:
+                raise KeyboardInterrupt
+            print(f"\n{'='*50}")
+            print("INTERRUPT SIGNAL RECEIVED")
+            print(f"{'='*50}")
+            self.interrupted = True
+            self.print_current_status()
+            print("\nGracefully shutting down...")
+            print("Cancelling in-flight valuations (press Ctrl+C again to force exit).")
+            batch_task.cancel()
+        
+        signals = [signal.SIGINT]
+        if hasattr(signal, 'SIGTERM'):
+            signals.append(signal.SIGTERM)
+        for sig in signals:
+            try:
+                loop.add_signal_handler(sig, shutdown)
+            except NotImplementedError:
+                # Windows event loops don't support add_signal_handler
+                signal.signal(sig, lambda signum, frame: loop.call_soon_threadsafe(shutdown))
+    
+    def print_current_status(self):
+        """Print current processing status"""
+        from .retry_manager import retry_stats
+        
+        if self.start_ns:
+            runtime_s = self.elapsed_seconds()
+            print(f"\n{'='*50}")
+            print("CURRENT STATUS")
+            print(f"{'='*50}")
+            print(f"Runtime: {runtime_s:.1f} seconds")
+            print(f"Entries processed: {retry_stats.valuations_processed}")
+            print(f"Success rate: {retry_stats.success_rate():.1f}%")
+            print(f"Browser retries: {retry_stats.browser_retries}")
+            print(f"Batch retries: {retry_stats.batch_retries}")
+            print(f"Consecutive failures: {retry_stats.consecutive_failures}")
+            print(f"Duplicate plates skipped: {retry_stats.duplicates_skipped}")
+            
+            # Memory usage (latest background sample)
+            if self.last_mem_mb is not None:
+                print(f"Memory usage: {self.last_mem_mb:.1f}MB")
+            print(f"{'='*50}")
+
+    def print_system_info(self):
+        """Print system information and configuration"""
+        print(f"\n{'='*60}")
+        print("ENHANCED WBAC SCRAPER WITH RETRY MECHANISM")
+        print(f"{'='*60}")
+        print(f"Platform: {platform.system()} {platform.release()}")
+        print(f"Python: {platform.python_version()}")
+        print(f"Start time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        
+        print(f"\nRETRY CONFIGURATION:")
+        print(f"  Browser retries: {RetryConfig.BROWSER_MAX_RETRIES}")
+        print(f"  Batch retries: {RetryConfig.BATCH_MAX_RETRIES}")
+        print(f"  Browser recycling: When memory exceeds {RetryConfig.MAX_MEMORY_USAGE_MB}MB or every {RetryConfig.BROWSER_MAX_PAGES} valuations")
+        print(f"  Memory check: Every {RetryConfig.MEMORY_CHECK_INTERVAL:.0f}s")
+        print(f"  Max memory usage: {RetryConfig.MAX_MEMORY_USAGE_MB}MB")
+        print(f"  Anti-detection delay: {RetryConfig.MIN_DELAY_BETWEEN_VALUATIONS}-{RetryConfig.MAX_DELAY_BETWEEN_VALUATIONS}s")
+        
+        # System resources
+        try:
+            import psutil
+            print(f"\nSYSTEM RESOURCES:")
+            print(f"  CPU cores: {psutil.cpu_count()}")
+            print(f"  Total RAM: {psutil.virtual_memory().total / 1024**3:.1f}GB")
+            print(f"  Available RAM: {psutil.virtual_memory().available / 1024**3:.1f}GB")
+        except:
+            pass
+        
+        print(f"{'='*60}")
+
+    async def run_batch_processing(self):
+        """Run the enhanced batch processing with comprehensive monitoring"""
+        from .retry_manager import process_all_entries_with_retry, retry_stats
+        from .database_utils import get_pool, close_pool, count_valuations_to_process
+        
+        self.start_ns = time.perf_counter_ns()
+        self.print_system_info()
+        mem_sampler = asyncio.create_task(self._mem_sampler())
+        
+        try:
+            # Only count here; the rows are streamed from the shared pool while processing
+            pool = await get_pool()
+            async with pool.acquire() as conn:
+                self.total_entries = await count_valuations_to_process(conn)
+            
+            print(f"\nFound {self.total_entries} entries to process")
+            
+            if self.total_entries == 0:
+                print("No entries to process. Exiting.")
+                return 0, 0
+            
+            # Estimate completion time (rough estimate: 30 seconds per valuation)
+            estimated_hours = (self.total_entries * 30) / 3600
+            print(f"Estimated completion time: {estimated_hours:.1f} hours")
+            
+            print(f"\n{'='*50}")
+            print("STARTING BATCH PROCESSING")
+            print(f"{'='*50}")
+            
+            # Run the enhanced processing as its own task so a signal can cancel it
+            batch_task = asyncio.create_task(
+                process_all_entries_with_retry(total_entries=self.total_entries)
+            )
+            self.setup_signal_handlers(batch_task)
+            success_count, failure_count = await batch_task
+            
+            # Final report
+            runtime_s = self.elapsed_seconds()
+            total_processed = success_count + failure_count
+            success_rate = (success_count / max(1, total_processed)) * 100
+            avg_time_per_valuation = runtime_s / max(1, total_processed)
+            
+            print(f"\n{'='*60}")
+            print("FINAL PROCESSING REPORT")
+            print(f"{'='*60}")
+            print(f"Total entries found: {self.total_entries}")
+            print(f"Entries processed: {total_processed}")
+            print(f"Successful: {success_count}")
+            print(f"Failed: {failure_count}")
+            print(f"Success rate: {success_rate:.1f}%")
+            print(f"Total runtime: {runtime_s:.1f} seconds ({runtime_s/3600:.1f} hours)")
+            print(f"Average time per valuation: {avg_time_per_valuation:.1f} seconds")
+            print(f"Processing rate: {3600/avg_time_per_valuation:.1f} valuations/hour")
+            
+            print(f"\nRETRY STATISTICS:")
+            print(f"  Browser retries: {retry_stats.browser_retries}")
+            print(f"  Batch retries: {retry_stats.batch_retries}")
+            print(f"  Browsers recycled: {retry_stats.browsers_recycled}")
+            print(f"  Consecutive failures: {retry_stats.consecutive_failures}")
+            
+            if total_processed < self.total_entries:
+                remaining = self.total_entries - total_processed
+                print(f"\nWARNING: {remaining} entries were not processed")
+                print("You may need to run the scraper again to complete all entries")
+            
+            print(f"{'='*60}")
+            
+            return success_count, failure_count
+            
+        except (KeyboardInterrupt, asyncio.CancelledError):
+            print("\n\nBatch processing interrupted by user")
+            self.print_current_status()
+            return retry_stats.total_successes, retry_stats.total_failures
+        except Exception as e:
+            print(f"\nCritical error in batch processing: {str(e)}")
+            traceback.print_exc()
+            self.print_current_status()
+            return retry_stats.total_successes, retry_stats.total_failures
+        finally:
+            mem_sampler.cancel()
+            await close_pool()
+
+    async def test_single_plate(self, plate: str, mileage: int):
+        """Test a single plate with the enhanced retry mechanism"""
+        print(f"\n{'='*50}")
+        print(f"TESTING SINGLE PLATE: {plate}")
+        print(f"{'='*50}")
+        
+        from .process_manager import process_single_plate
+        
+        self.start_ns = time.perf_counter_ns()
+        
+        try:
+            result = await process_single_plate(plate, mileage)
+            
+            print(f"\nTest completed in {self.elapsed_seconds():.1f} seconds")
+            
+            if result:
+                print(f"✓ SUCCESS: Valuation retrieved for {plate}")
+            else:
+                print(f"✗ FAILED: Could not retrieve valuation for {plate}")
+            
+            return result
+            
+        except Exception as e:
+            print(f"✗ ERROR testing {plate}: {str(e)}")
+            traceback.print_exc()
+            return None
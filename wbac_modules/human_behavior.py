@@ -4,12 +4,20 @@ Functions for simulating human-like behavior
 import asyncio
 import random
 import string
+import weakref
+
+from .config import HUMAN_BEHAVIOR, HUMAN_BEHAVIOR_WARMUP_PLATES
+
+# Plates valued so far on each browser (for HUMAN_BEHAVIOR = "warm")
+_plates_per_browser = weakref.WeakKeyDictionary()
+
+EMAIL_DOMAINS = ("gmail.com", "outlook.com", "yahoo.com", "hotmail.com")
+POSTCODES = ("BD3 7HR", "LS1 4AX", "M1 1AE", "B1 1HQ", "EC1A 1BB", "SW1A 1AA")
 
 def generate_random_email():
     """Generate a random email address for more natural interactions."""
-    domains = ["gmail.com", "outlook.com", "yahoo.com", "hotmail.com"]
     username_part = ''.join(random.choices(string.ascii_lowercase + string.digits, k=random.randint(6, 10)))
-    domain = random.choice(domains)
+    domain = random.choice(EMAIL_DOMAINS)
     return f"{username_part}@{domain}"
 
 def generate_random_uk_phone():
@@ -17,15 +25,34 @@ def generate_random_uk_phone():
     return "07" + ''.join(random.choices("0123456789", k=9))
 
 def generate_random_postcode():
-    """Generate a random UK postcode."""
-    postcodes = ["BD3 7HR", "LS1 4AX", "M1 1AE", "B1 1HQ", "EC1A 1BB", "SW1A 1AA"]
-    return random.choice(postcodes)
+    """Pick one of the known-valid UK postcodes."""
+    return random.choice(POSTCODES)
 
-async def human_type(page, selector, text, random_delay=False):
-    """Type text into an input field with minimal human-like delays."""
+# Contact details reused across plates: (email, postcode, phone), built on first use
+IDENTITY_POOL_SIZE = 32
+_identity_pool = []
+
+def get_identity():
+    """Return an (email, postcode, phone) tuple from a small pool generated once per process."""
+    if not _identity_pool:
+        _identity_pool.extend(
+            (generate_random_email(), generate_random_postcode(), generate_random_uk_phone())
+            for _ in range(IDENTITY_POOL_SIZE)
+        )
+    return random.choice(_identity_pool)
+
+async def human_type(page, selector, text, random_delay=False, slow=False):
+    """
+    Enter text into an input field with minimal human-like delays.
+    The field is clicked (focus) and filled in one go, which fires the same
+    input/change events as typing; pass slow=True to type key by key instead.
+    """
     await page.click(selector)
     await asyncio.sleep(0.1)  # Consistent small delay
-    await page.type(selector, text, delay=50)  # 50ms delay between keystrokes
+    if slow:
+        await page.type(selector, text, delay=50)  # 50ms delay between keystrokes
+    else:
+        await page.fill(selector, text)
     if random_delay:
         await asyncio.sleep(random.uniform(0.1, 0.3))
 
@@ -43,12 +70,9 @@ async def human_click(page, selector, wait_after=False):
             raise
 
 async def human_scroll(page, direction, distance):
-    """Scroll the page by a given distance."""
-    if direction == "down":
-        await page.evaluate(f'window.scrollBy(0, {distance})')
-    else:
-        await page.evaluate(f'window.scrollBy(0, -{distance})')
-    await asyncio.sleep(0.2)
+    """Scroll the page by a given distance (the reading pause in simulate_human_behavior follows it)."""
+    dy = distance if direction == "down" else -distance
+    await page.evaluate("(dy) => window.scrollBy({top: dy, behavior: 'instant'})", dy)
 
 async def human_mouse_move(page, selector):
     """Move the mouse to an element (simplified)."""
@@ -57,15 +81,34 @@ async def human_mouse_move(page, selector):
     except Exception:
         pass
 
+def record_plate_valued(page):
+    """Count a finished valuation against the page's browser (see HUMAN_BEHAVIOR = "warm")."""
+    browser = page.context.browser
+    if browser is not None:
+        _plates_per_browser[browser] = _plates_per_browser.get(browser, 0) + 1
+
+def _full_behavior_wanted(page):
+    if HUMAN_BEHAVIOR in ("off", "minimal"):
+        return False
+    if HUMAN_BEHAVIOR == "warm":
+        browser = page.context.browser
+        return browser is None or _plates_per_browser.get(browser, 0) < HUMAN_BEHAVIOR_WARMUP_PLATES
+    return True
+
 async def simulate_human_behavior(page):
     """
     Simulate additional human behavior by scrolling, random mouse hovering,
     and taking a brief 'thinking pause.'
+    Reduced to a short pause (or skipped) according to HUMAN_BEHAVIOR.
     """
+    if not _full_behavior_wanted(page):
+        if HUMAN_BEHAVIOR != "off":
+            await asyncio.sleep(random.uniform(0.1, 0.3))
+        return
+    
     # Random scroll up or down between 100 and 300 pixels
     scroll_distance = random.randint(100, 300)
-    direction = random.choice(["up", "down"])
-    await human_scroll(page, "down" if direction == "down" else "up", scroll_distance)
+    await human_scroll(page, random.choice(["up", "down"]), scroll_distance)
     
     # Randomly hover over one of a set of common selectors (if they exist)
     potential_selectors = ["header", "nav", "footer", "img", "article"]
@@ -6,15 +6,16 @@ import asyncio
 import platform
 from datetime import datetime
 import re
+import time
 import traceback
 
 from .database_utils import (
-    connect_to_database, insert_failure, verify_record_exists,
+    get_pool, close_pool, insert_failure,
     fetch_valuations_to_process, insert_valuation
 )
 
 # Import the retry mechanism
-from .retry_manager import process_all_entries_with_retry, retry_stats
+from .retry_manager import process_all_entries_with_retry, retry_stats, SharedBrowser, SALVAGE_FACTORS
 
 # Import the appropriate valuation module based on platform
 IS_WINDOWS = platform.system() == 'Windows'
@@ -66,15 +67,20 @@ async def process_all_entries_legacy():
     start_time = datetime.now()
     print(f"Starting LEGACY WBAC valuation process at {start_time.strftime('%Y-%m-%d %H:%M:%S')}")
     
+    pool = None
     conn = None
     success_count = 0
     failure_count = 0
+    # One browser for the whole run; each plate gets a fresh context in it
+    shared_browser = SharedBrowser(1)
     
     try:
-        conn = await connect_to_database()
+        pool = await get_pool()
+        conn = await pool.acquire()
         rows = await fetch_valuations_to_process(conn)
         
         print(f"Found {len(rows)} entries to valuate")
+        await shared_browser.start()
         
         for row in rows:
             unique_id = row['unique_id']
@@ -85,11 +91,7 @@ async def process_all_entries_legacy():
             print(f"\nProcessing: {plate} (ID: {unique_id})")
             
             try:
-                # Use the appropriate valuation function based on platform
-                if IS_WINDOWS:
-                    valuation_text = get_valuation_windows(plate, mileage)
-                else:
-                    valuation_text = await process_valuation(plate, mileage)
+                valuation_text = await shared_browser.value(plate, mileage)
                 
                 if not valuation_text:
                     await insert_failure(conn, unique_id, plate, mileage, "Car not found or valuation retrieval failed")
@@ -110,16 +112,10 @@ async def process_all_entries_legacy():
                 
                 # Apply salvage category adjustment if needed
                 original_valuation = None
-                if salvage_category in ['CAT N', 'CAT S']:
+                if salvage_category in SALVAGE_FACTORS:
                     original_valuation = valuation_number
-                    if salvage_category == 'CAT N':
-                        # For Cat N, reduce valuation by 15%
-                        valuation_number = valuation_number * 0.85
-                        print(f"CAT N salvage detected: adjusted valuation from £{original_valuation:.2f} to £{valuation_number:.2f}")
-                    elif salvage_category == 'CAT S':
-                        # For Cat S, reduce valuation by 30%
-                        valuation_number = valuation_number * 0.70
-                        print(f"CAT S salvage detected: adjusted valuation from £{original_valuation:.2f} to £{valuation_number:.2f}")
+                    valuation_number = valuation_number * SALVAGE_FACTORS[salvage_category]
+                    print(f"{salvage_category} salvage detected: adjusted valuation from £{original_valuation:.2f} to £{valuation_number:.2f}")
                 
                 # Insert into valid_valuation table and remove from to_valuate
                 success = await insert_valuation(
@@ -129,7 +125,6 @@ async def process_all_entries_legacy():
                 
                 if success:
                     success_count += 1
-                    await verify_record_exists(conn, unique_id)
                 else:
                     failure_count += 1
                 
@@ -144,8 +139,10 @@ async def process_all_entries_legacy():
                 failure_count += 1
     
     finally:
+        await shared_browser.close()
         if conn:
-            await conn.close()
+            await pool.release(conn)
+        await close_pool()
         
         duration = datetime.now() - start_time
         print(f"\nWBAC valuation process completed: {success_count} successful, {failure_count} failed")
@@ -158,7 +155,7 @@ async def process_single_plate(plate, mileage):
     Process a single plate for testing without database storage.
     """
     print(f"\nTesting single plate: {plate} with mileage: {mileage}")
-    start_time = datetime.now()
+    start_ns = time.perf_counter_ns()
     
     try:
         # Use the appropriate valuation function based on platform
@@ -182,8 +179,8 @@ async def process_single_plate(plate, mileage):
         
         print(f"[SUCCESS] Parsed valuation for {plate}: £{valuation_number:.2f}")
         
-        duration = datetime.now() - start_time
-        print(f"\nProcess completed in {duration.total_seconds():.1f} seconds")
+        duration_s = (time.perf_counter_ns() - start_ns) / 1e9
+        print(f"\nProcess completed in {duration_s:.1f} seconds")
         
         return valuation_number
         
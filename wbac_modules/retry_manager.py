@@ -3,11 +3,12 @@ Robust retry mechanism for WBAC scraper with multi-layered retry architecture.
 Implements browser-level, component-level, batch-level, and process-level resilience.
 """
 import asyncio
+import logging
 import time
 import random
-import traceback
 import platform
-from datetime import datetime, timedelta
+from collections import deque
+from datetime import datetime
 from typing import Optional, Callable, Any, Dict, List
 import psutil
 import gc
@@ -16,47 +17,39 @@ import gc
 IS_WINDOWS = platform.system() == 'Windows'
 
 if IS_WINDOWS:
-    from .windows_valuation import get_valuation_windows, parse_valuation, WindowsValuationError as ValuationError
+    from .windows_valuation import (
+        get_valuation_windows, parse_valuation, WindowsValuationError as ValuationError,
+        WindowsBrowserSession
+    )
 else:
+    from playwright.async_api import async_playwright
     from .valuation_service import process_valuation 
-    from .browser_utils import parse_valuation, ValuationError
+    from .browser_utils import parse_valuation, ValuationError, launch_browser
+
+from .browser_utils import MEMORY_SAMPLE_TTL, process_tree_rss_mb
+from .config import RetryConfig
 
 from .database_utils import (
-    connect_to_database, insert_failure, verify_record_exists,
-    fetch_valuations_to_process, insert_valuation
+    get_pool, close_pool,
+    count_valuations_to_process, stream_valuations_to_process,
+    insert_failures, insert_valuations
 )
 
-class RetryConfig:
-    """Configuration for retry mechanisms"""
-    # Browser-level retry settings
-    BROWSER_MAX_RETRIES = 3
-    BROWSER_RETRY_DELAY_BASE = 2.0  # Base delay in seconds
-    BROWSER_RETRY_DELAY_MAX = 30.0  # Maximum delay in seconds
-    
-    # Batch-level retry settings  
-    BATCH_MAX_RETRIES = 10
-    BATCH_RETRY_DELAY_BASE = 5.0
-    BATCH_RETRY_DELAY_MAX = 120.0
-    
-    # Resource management
-    BROWSER_RECYCLING_THRESHOLD = 75  # Recycle after this many valuations
-    MEMORY_CHECK_INTERVAL = 50  # Check memory every N valuations
-    MAX_MEMORY_USAGE_MB = 2048  # Force cleanup if memory exceeds this
-    
-    # Processing delays for anti-detection
-    MIN_DELAY_BETWEEN_VALUATIONS = 2.0
-    MAX_DELAY_BETWEEN_VALUATIONS = 5.0
-    
-    # Network resilience
-    CONNECTION_TIMEOUT = 30.0
-    NAVIGATION_TIMEOUT = 45.0
-    
-    # Error thresholds
-    MAX_CONSECUTIVE_FAILURES = 5
-    FORCE_RESTART_THRESHOLD = 10
+log = logging.getLogger(__name__)
 
 class RetryStatistics:
-    """Track retry statistics and performance metrics"""
+    """
+    Track retry statistics and performance metrics.
+    All counters are plain ints updated in place, so they can be read at any time
+    (status prints, signal handlers) at no cost. Times are time.monotonic() floats.
+    """
+    __slots__ = (
+        'total_attempts', 'total_successes', 'total_failures', 'browser_retries',
+        'batch_retries', 'consecutive_failures', 'valuations_processed',
+        'browsers_recycled', 'duplicates_skipped',
+        '_start_monotonic', '_last_success_monotonic',
+    )
+    
     def __init__(self):
         self.reset()
     
@@ -67,10 +60,11 @@ class RetryStatistics:
         self.browser_retries = 0
         self.batch_retries = 0
         self.consecutive_failures = 0
-        self.start_time = datetime.now()
-        self.last_success_time = None
+        self._start_monotonic = time.monotonic()
+        self._last_success_monotonic = None
         self.valuations_processed = 0
         self.browsers_recycled = 0
+        self.duplicates_skipped = 0
         
     def record_attempt(self):
         self.total_attempts += 1
@@ -78,7 +72,7 @@ class RetryStatistics:
     def record_success(self):
         self.total_successes += 1
         self.consecutive_failures = 0
-        self.last_success_time = datetime.now()
+        self._last_success_monotonic = time.monotonic()
         self.valuations_processed += 1
         
     def record_failure(self):
@@ -94,13 +88,24 @@ class RetryStatistics:
     def record_browser_recycle(self):
         self.browsers_recycled += 1
         
+    def record_duplicate(self):
+        self.duplicates_skipped += 1
+        
+    def success_rate(self) -> float:
+        """Successes as a percentage of attempts"""
+        return (self.total_successes / max(1, self.total_attempts)) * 100
+    
     def should_force_restart(self) -> bool:
         return (self.consecutive_failures >= RetryConfig.MAX_CONSECUTIVE_FAILURES or
                 self.total_failures >= RetryConfig.FORCE_RESTART_THRESHOLD)
     
+    def runtime_seconds(self) -> float:
+        """Seconds since the last reset"""
+        return time.monotonic() - self._start_monotonic
+    
     def get_summary(self) -> str:
-        duration = datetime.now() - self.start_time
-        success_rate = (self.total_successes / max(1, self.total_attempts)) * 100
+        duration_s = self.runtime_seconds()
+        success_rate = self.success_rate()
         
         return (
             f"=== RETRY STATISTICS ===\n"
@@ -111,41 +116,289 @@ class RetryStatistics:
             f"Browser retries: {self.browser_retries}\n"
             f"Batch retries: {self.batch_retries}\n"
             f"Browsers recycled: {self.browsers_recycled}\n"
+            f"Duplicate plates skipped: {self.duplicates_skipped}\n"
             f"Consecutive failures: {self.consecutive_failures}\n"
-            f"Runtime: {duration.total_seconds():.1f} seconds\n"
-            f"Avg time per valuation: {duration.total_seconds() / max(1, self.valuations_processed):.1f}s\n"
+            f"Runtime: {duration_s:.1f} seconds\n"
+            f"Avg time per valuation: {duration_s / max(1, self.valuations_processed):.1f}s\n"
         )
 
 # Global statistics instance
 retry_stats = RetryStatistics()
 
+class AdaptiveLimiter:
+    """
+    AIMD cap on the valuations in flight (see RetryConfig.OVERLOAD_RATE): halved when
+    too many recent attempts failed, which is how WBAC throttling or blocking shows up,
+    and raised by one after a run of successes, so a run settles near the rate the
+    site accepts. A result of None (car not found) counts as a success.
+    """
+    def __init__(self, maximum: int, minimum: int = RetryConfig.MIN_CONCURRENCY):
+        self.maximum = maximum
+        self.minimum = min(minimum, maximum)
+        self.limit = maximum
+        self.in_flight = 0
+        self._outcomes = deque(maxlen=RetryConfig.OVERLOAD_WINDOW)
+        self._successes_in_row = 0
+        self._changed_at = float('-inf')
+        self._condition = asyncio.Condition()
+    
+    async def acquire(self):
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_flight < self.limit)
+            self.in_flight += 1
+    
+    async def release(self, succeeded: Optional[bool]):
+        """Give the permit back; `succeeded` is None if the attempt was cancelled"""
+        async with self._condition:
+            self.in_flight -= 1
+            if succeeded is not None:
+                self._record(succeeded)
+            self._condition.notify_all()
+    
+    def _record(self, succeeded: bool):
+        self._outcomes.append(succeeded)
+        self._successes_in_row = self._successes_in_row + 1 if succeeded else 0
+        now = time.monotonic()
+        if now - self._changed_at < RetryConfig.SCALING_COOLDOWN:
+            return
+        
+        failures = self._outcomes.count(False)
+        if (not succeeded and self.limit > self.minimum
+                and len(self._outcomes) * 2 >= self._outcomes.maxlen
+                and failures > len(self._outcomes) * RetryConfig.OVERLOAD_RATE):
+            self.limit = max(self.minimum, self.limit // 2)
+            # The new limit is judged on its own outcomes
+            self._outcomes.clear()
+            self._changed_at = now
+            print(f"[THROTTLE] {failures} recent attempts failed - concurrency down to {self.limit}")
+        elif self._successes_in_row >= RetryConfig.GROWTH_SUCCESSES and self.limit < self.maximum:
+            self.limit += 1
+            self._successes_in_row = 0
+            self._changed_at = now
+            print(f"[THROTTLE] {RetryConfig.GROWTH_SUCCESSES} successes in a row - concurrency up to {self.limit}")
+
+class SharedBrowser:
+    """
+    Browsers kept open for a whole run; every valuation gets a fresh context.
+    On Windows each of the `concurrency` slots is a WindowsBrowserSession (sync
+    Playwright on its own thread); elsewhere the slots share one async browser and
+    a spare is launched in the background, so a relaunch doesn't wait for Chromium.
+    Browsers are retired after RetryConfig.BROWSER_MAX_PAGES valuations.
+    """
+    def __init__(self, concurrency: int = 1):
+        self.concurrency = concurrency
+        self.pages_served = 0  # Valuations run since start (all browsers)
+        self._browser_pages = 0  # ...and on the current async browser
+        self._retire_task = None
+        self._slots = asyncio.Queue()
+        self._recycle_lock = asyncio.Lock()
+        self._swap_lock = asyncio.Lock()
+        self._sessions = []
+        self._playwright = None
+        self._browser = None
+        self._spare = None  # Task launching the next browser
+        # Valuations in flight are capped below `concurrency` while WBAC pushes back
+        self.limiter = AdaptiveLimiter(concurrency)
+    
+    async def start(self):
+        if IS_WINDOWS:
+            self._sessions = [
+                WindowsBrowserSession(max_pages=RetryConfig.BROWSER_MAX_PAGES)
+                for _ in range(self.concurrency)
+            ]
+            for session in self._sessions:
+                self._slots.put_nowait(session)
+        else:
+            self._playwright = await async_playwright().start()
+            self._browser = await launch_browser(self._playwright)
+            self._launch_spare()
+            for _ in range(self.concurrency):
+                self._slots.put_nowait(None)
+    
+    def _launch_spare(self):
+        self._spare = asyncio.create_task(launch_browser(self._playwright))
+    
+    async def _take_spare(self):
+        """Return the warm spare browser (launching one if that failed) and start the next"""
+        spare, self._spare = self._spare, None
+        try:
+            browser = await spare
+        except Exception as e:
+            print(f"Spare browser launch failed: {str(e)}")
+            browser = await launch_browser(self._playwright)
+        self._launch_spare()
+        return browser
+    
+    async def value(self, plate: str, mileage: int) -> Optional[str]:
+        """Get the valuation text for one plate in a new context"""
+        await self.limiter.acquire()
+        succeeded = None
+        try:
+            valuation_text = await self._value_in_slot(plate, mileage)
+            succeeded = True
+            return valuation_text
+        except Exception:
+            succeeded = False
+            raise
+        finally:
+            await self.limiter.release(succeeded)
+    
+    async def _value_in_slot(self, plate: str, mileage: int) -> Optional[str]:
+        session = await self._slots.get()
+        try:
+            if IS_WINDOWS:
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(
+                    session.executor, get_valuation_windows, plate, mileage, session
+                )
+            
+            if not self._browser.is_connected():
+                async with self._swap_lock:
+                    # Another slot may already have swapped it
+                    if not self._browser.is_connected():
+                        print("Browser disconnected - switching to the spare")
+                        self._browser = await self._take_spare()
+                        self._browser_pages = 0
+            self._browser_pages += 1
+            return await process_valuation(plate, mileage, self._browser)
+        finally:
+            self.pages_served += 1
+            self._slots.put_nowait(session)
+            retiring = self._retire_task and not self._retire_task.done()
+            if (not IS_WINDOWS and not retiring
+                    and self._browser_pages >= RetryConfig.BROWSER_MAX_PAGES):
+                # Recycle once the slots are free again (the spare makes it quick)
+                self._retire_task = asyncio.create_task(self._retire())
+    
+    async def _retire(self):
+        print(f"[RECYCLE] Browser retired after {self._browser_pages} valuations")
+        await self.recycle()
+        retry_stats.record_browser_recycle()
+    
+    async def recycle(self):
+        """Close the browser(s) and start again once in-flight valuations finish"""
+        async with self._recycle_lock:
+            slots = [await self._slots.get() for _ in range(self.concurrency)]
+            old_browser = None
+            try:
+                if IS_WINDOWS:
+                    loop = asyncio.get_running_loop()
+                    for session in slots:
+                        await loop.run_in_executor(session.executor, session.recycle)
+                else:
+                    async with self._swap_lock:
+                        old_browser = self._browser
+                        self._browser = await self._take_spare()
+                        self._browser_pages = 0
+            finally:
+                for slot in slots:
+                    self._slots.put_nowait(slot)
+            
+            # Valuations have already moved on to the new browser
+            if old_browser:
+                try:
+                    await old_browser.close()
+                except Exception as e:
+                    print(f"Error closing browser: {str(e)}")
+    
+    async def close(self):
+        if self._retire_task and not self._retire_task.done():
+            self._retire_task.cancel()
+            try:
+                await self._retire_task
+            except asyncio.CancelledError:
+                pass
+        for session in self._sessions:
+            await asyncio.to_thread(session.close)
+        browsers = [self._browser]
+        if self._spare:
+            try:
+                browsers.append(await self._spare)
+            except Exception as e:
+                print(f"Spare browser launch failed: {str(e)}")
+        for browser in browsers:
+            if browser:
+                try:
+                    await browser.close()
+                except Exception as e:
+                    print(f"Error closing browser: {str(e)}")
+        if self._playwright:
+            await self._playwright.stop()
+
+# Attempts beyond this are already at max_delay for any sane base; capping the
+# shift keeps huge attempt numbers from overflowing the float conversion
+_BACKOFF_MAX_SHIFT = 16
+
 def exponential_backoff(attempt: int, base_delay: float, max_delay: float) -> float:
-    """Calculate exponential backoff with jitter"""
-    delay = min(base_delay * (2 ** attempt), max_delay)
-    # Add random jitter (±25%)
-    jitter = delay * 0.25 * (random.random() * 2 - 1)
-    return max(0.1, delay + jitter)
+    """
+    Exponential backoff with full jitter: anywhere from 0 up to the capped exponential
+    delay, so rows that failed together (e.g. one network drop) don't retry together.
+    """
+    ceiling = min(base_delay * (1 << min(attempt, _BACKOFF_MAX_SHIFT)), max_delay)
+    return max(0.1, random.uniform(0, ceiling))
+
+_PROCESS = psutil.Process()
+_memory_sample = (float('-inf'), None)  # (monotonic time, usage dict)
 
-def check_memory_usage() -> Dict[str, float]:
-    """Check current memory usage"""
-    process = psutil.Process()
-    memory_info = process.memory_info()
-    return {
+def check_memory_usage(max_age: float = MEMORY_SAMPLE_TTL) -> Dict[str, float]:
+    """Check current memory usage (readings younger than max_age seconds are reused)"""
+    global _memory_sample
+    sampled_at, usage = _memory_sample
+    now = time.monotonic()
+    if now - sampled_at < max_age:
+        return usage
+    
+    memory_info = _PROCESS.memory_info()
+    usage = {
         'rss_mb': memory_info.rss / 1024 / 1024,  # Resident Set Size in MB
         'vms_mb': memory_info.vms / 1024 / 1024,  # Virtual Memory Size in MB
-        'percent': process.memory_percent()
+        'percent': _PROCESS.memory_percent()
     }
+    _memory_sample = (now, usage)
+    return usage
+
+async def force_memory_cleanup():
+    """
+    Force a full garbage collection in a worker thread, so other valuations keep running.
+    Only called when memory is over the limit or a batch attempt ends; Python's own
+    GC handles everything in between. The working set is not trimmed: the OS would
+    just page the same memory back in on the next valuation.
+    """
+    await asyncio.to_thread(gc.collect)
+
+def _sample_memory():
+    return check_memory_usage(max_age=0), process_tree_rss_mb()
 
-def force_memory_cleanup():
-    """Force garbage collection and memory cleanup"""
-    gc.collect()
-    if IS_WINDOWS:
-        # Additional Windows-specific cleanup if needed
+async def watch_memory(stop: asyncio.Event, shared_browser: Optional[SharedBrowser] = None):
+    """
+    Check memory every RetryConfig.MEMORY_CHECK_INTERVAL seconds until `stop` is set.
+    The psutil probes run on a worker thread, so neither the rows nor the loop wait on them.
+    """
+    # On Windows every slot has its own browser in the process tree
+    tree_limit_mb = RetryConfig.MAX_MEMORY_USAGE_MB
+    if shared_browser and IS_WINDOWS:
+        tree_limit_mb *= shared_browser.concurrency
+    
+    while not stop.is_set():
         try:
-            import ctypes
-            ctypes.windll.kernel32.SetProcessWorkingSetSize(-1, -1, -1)
-        except:
-            pass
+            await asyncio.wait_for(stop.wait(), RetryConfig.MEMORY_CHECK_INTERVAL)
+        except asyncio.TimeoutError:
+            try:
+                memory_info, tree_mb = await asyncio.to_thread(_sample_memory)
+                log.debug("Memory usage: %.1fMB (%.1f%%)", memory_info['rss_mb'], memory_info['percent'])
+                
+                if memory_info['rss_mb'] > RetryConfig.MAX_MEMORY_USAGE_MB:
+                    print("High memory usage detected - forcing cleanup")
+                    await force_memory_cleanup()
+                
+                # Contexts are closed after every plate, so the browser itself is only
+                # recycled once it (plus this process) has grown too large
+                if shared_browser and tree_mb > tree_limit_mb:
+                    print("High browser memory usage detected - recycling browser")
+                    await shared_browser.recycle()
+                    retry_stats.record_browser_recycle()
+            except Exception as e:
+                print(f"Error checking memory usage: {str(e)}")
 
 async def retry_with_backoff(
     func: Callable,
@@ -161,23 +414,18 @@ async def retry_with_backoff(
     Generic retry mechanism with exponential backoff
     """
     last_exception = None
+    is_coroutine = asyncio.iscoroutinefunction(func)
     
     for attempt in range(max_retries + 1):
         try:
             retry_stats.record_attempt()
             
-            if IS_WINDOWS:
-                # For sync functions on Windows
-                if asyncio.iscoroutinefunction(func):
-                    result = await func(*args, **kwargs)
-                else:
-                    result = func(*args, **kwargs)
+            if is_coroutine:
+                result = await func(*args, **kwargs)
             else:
-                # For async functions on other platforms
-                if asyncio.iscoroutinefunction(func):
-                    result = await func(*args, **kwargs)
-                else:
-                    result = func(*args, **kwargs)
+                # Sync functions (get_valuation_windows) run on a worker thread, so the
+                # loop stays live and sync Playwright isn't started inside it
+                result = await asyncio.to_thread(func, *args, **kwargs)
             
             retry_stats.record_success()
             return result
@@ -194,11 +442,8 @@ async def retry_with_backoff(
             if attempt < max_retries:
                 delay = exponential_backoff(attempt, base_delay, max_delay)
                 print(f"Retry {attempt + 1}/{max_retries} after {delay:.1f}s delay. Error: {str(e)}")
-                
-                if IS_WINDOWS:
-                    time.sleep(delay)
-                else:
-                    await asyncio.sleep(delay)
+                # Never block the loop: other rows are being valued concurrently
+                await asyncio.sleep(delay)
             else:
                 print(f"Max retries ({max_retries}) exceeded")
                 break
@@ -206,23 +451,24 @@ async def retry_with_backoff(
     # If we get here, all retries failed
     raise last_exception
 
-async def browser_level_retry(plate: str, mileage: int) -> Optional[str]:
+async def browser_level_retry(plate: str, mileage: int, shared_browser: Optional[SharedBrowser] = None) -> Optional[str]:
     """
-    Browser-level retry with fresh browser instances
+    Browser-level retry; each attempt gets a fresh context in the shared browser,
+    or a fresh browser instance if none is given
     """
     def error_handler(error, attempt):
         retry_stats.record_browser_retry()
-        print(f"Browser-level retry {attempt + 1} for {plate}: {str(error)}")
-        
-        # Force memory cleanup on retry
-        if attempt > 0:
-            force_memory_cleanup()
-        
+        log.debug("Browser-level retry %s for %s: %s", attempt + 1, plate, error)
         return True  # Always retry at browser level
     
     try:
+        if shared_browser:
+            valuation_func = shared_browser.value
+        else:
+            valuation_func = get_valuation_windows if IS_WINDOWS else process_valuation
+        
         return await retry_with_backoff(
-            get_valuation_windows if IS_WINDOWS else process_valuation,
+            valuation_func,
             plate, mileage,
             max_retries=RetryConfig.BROWSER_MAX_RETRIES,
             base_delay=RetryConfig.BROWSER_RETRY_DELAY_BASE,
@@ -231,53 +477,46 @@ async def browser_level_retry(plate: str, mileage: int) -> Optional[str]:
             error_handler=error_handler
         )
     except Exception as e:
-        print(f"Browser-level retry failed for {plate}: {str(e)}")
+        # Unexpected errors are chained by the valuation layer, which logs only a line per
+        # attempt; show their full traceback once, now that every attempt has failed
+        if e.__cause__ is not None:
+            log.error("Browser-level retry failed for %s: %s", plate, e, exc_info=e)
+        else:
+            print(f"Browser-level retry failed for {plate}: {str(e)}")
         return None
 
-async def process_single_valuation_with_retry(row: Dict) -> tuple[bool, str]:
+# Share of the WBAC valuation recorded for salvage categories
+SALVAGE_FACTORS = {'CAT N': 0.85, 'CAT S': 0.70}
+
+async def process_single_valuation_with_retry(
+    row: Dict, shared_browser: Optional[SharedBrowser] = None
+) -> tuple[bool, Optional[float], Optional[float], str]:
     """
-    Process a single valuation with comprehensive retry logic
+    Process a single valuation with comprehensive retry logic.
+    Returns (success, valuation, original valuation, message); the original valuation is
+    the WBAC figure before any salvage adjustment, and both are None on failure.
     """
     unique_id = row['unique_id']
     plate = row['number_plate']
     mileage = row['mileage'] or 0
     salvage_category = row['salvage_category']
     
-    print(f"\nProcessing: {plate} (ID: {unique_id}, Mileage: {mileage})")
-    
-    # Check memory usage periodically
-    if retry_stats.valuations_processed % RetryConfig.MEMORY_CHECK_INTERVAL == 0:
-        memory_info = check_memory_usage()
-        print(f"Memory usage: {memory_info['rss_mb']:.1f}MB ({memory_info['percent']:.1f}%)")
-        
-        if memory_info['rss_mb'] > RetryConfig.MAX_MEMORY_USAGE_MB:
-            print("High memory usage detected - forcing cleanup")
-            force_memory_cleanup()
-    
-    # Browser recycling logic
-    if (retry_stats.valuations_processed > 0 and 
-        retry_stats.valuations_processed % RetryConfig.BROWSER_RECYCLING_THRESHOLD == 0):
-        print(f"Browser recycling threshold reached ({RetryConfig.BROWSER_RECYCLING_THRESHOLD})")
-        retry_stats.record_browser_recycle()
-        force_memory_cleanup()
+    log.debug("Processing: %s (ID: %s, Mileage: %s)", plate, unique_id, mileage)
     
     # Add random delay between valuations for anti-detection
     delay = random.uniform(
         RetryConfig.MIN_DELAY_BETWEEN_VALUATIONS,
         RetryConfig.MAX_DELAY_BETWEEN_VALUATIONS
     )
-    if IS_WINDOWS:
-        time.sleep(delay)
-    else:
-        await asyncio.sleep(delay)
+    await asyncio.sleep(delay)
     
     # Attempt to get valuation with browser-level retry
-    valuation_text = await browser_level_retry(plate, mileage)
+    valuation_text = await browser_level_retry(plate, mileage, shared_browser)
     
     if not valuation_text:
         error_msg = "Car not found or valuation retrieval failed after all retries"
         print(f"[FAILURE] {plate}: {error_msg}")
-        return False, error_msg
+        return False, None, None, error_msg
     
     # Parse the valuation from text to number
     try:
@@ -285,99 +524,217 @@ async def process_single_valuation_with_retry(row: Dict) -> tuple[bool, str]:
     except Exception as e:
         error_msg = f"Valuation parsing error: {str(e)}"
         print(f"[FAILURE] {plate}: {error_msg}")
-        return False, error_msg
+        return False, None, None, error_msg
     
     if valuation_number is None or valuation_number <= 0:
         error_msg = f"Invalid valuation: '{valuation_text}'"
         print(f"[FAILURE] {plate}: {error_msg}")
-        return False, error_msg
+        return False, None, None, error_msg
     
     # Apply salvage category adjustment if needed
-    original_valuation = None
-    if salvage_category in ['CAT N', 'CAT S']:
-        original_valuation = valuation_number
-        if salvage_category == 'CAT N':
-            valuation_number = valuation_number * 0.85
-            print(f"CAT N salvage: adjusted from £{original_valuation:.2f} to £{valuation_number:.2f}")
-        elif salvage_category == 'CAT S':
-            valuation_number = valuation_number * 0.70
-            print(f"CAT S salvage: adjusted from £{original_valuation:.2f} to £{valuation_number:.2f}")
+    original_valuation = valuation_number
+    if salvage_category in SALVAGE_FACTORS:
+        valuation_number = valuation_number * SALVAGE_FACTORS[salvage_category]
+        log.debug("%s salvage: adjusted from £%.2f to £%.2f", salvage_category, original_valuation, valuation_number)
     
     print(f"[SUCCESS] {plate}: £{valuation_number:.2f}")
-    return True, f"Success: £{valuation_number:.2f}"
+    return True, valuation_number, original_valuation, f"Success: £{valuation_number:.2f}"
 
-async def batch_level_retry(rows: List[Dict]) -> tuple[int, int]:
+async def stream_rows_to_process():
+    """Stream the entries to valuate from a pooled connection as they are fetched"""
+    pool = await get_pool()
+    async with pool.acquire() as conn:
+        async for row in stream_valuations_to_process(conn, RetryConfig.DB_PREFETCH):
+            yield row
+
+async def _iter_rows(rows):
+    for row in rows:
+        yield row
+
+async def batch_level_retry(rows, shared_browser: Optional[SharedBrowser] = None, total: Optional[int] = None) -> tuple[int, int, list]:
     """
-    Batch-level retry that processes all entries with resilience
+    Batch-level retry that processes all entries with resilience.
+    `rows` is a list or an async iterator (see stream_rows_to_process); rows are fed
+    through a bounded queue to RetryConfig.CONCURRENCY workers as they arrive.
+    Returns the success and failure counts plus the rows left unhandled.
     """
     success_count = 0
     failure_count = 0
-    conn = None
+    unhandled_rows = []
+    pool = None
+    pending_valuations = []
+    pending_failures = []
+    queue = asyncio.Queue(maxsize=RetryConfig.CONCURRENCY * 2)
+    if total is None:
+        total = len(rows)
     
-    try:
-        conn = await connect_to_database()
+    # Rows repeating a plate at the same mileage are valued once: `outcomes` holds
+    # finished results as (unadjusted valuation, failure reason), `duplicates` the
+    # rows waiting on one in flight. Each row then gets its own salvage adjustment.
+    outcomes = {}
+    duplicates = {}
+    
+    def plate_key(row):
+        return ((row['number_plate'] or '').strip().upper(), row['mileage'] or 0)
+    
+    def record(row, base_valuation, failure_reason):
+        mileage = row['mileage'] or 0
+        if failure_reason is None:
+            valuation_number = round(base_valuation * SALVAGE_FACTORS.get(row['salvage_category'], 1.0), 2)
+            # Queue for valid_valuation (written in batches)
+            pending_valuations.append((row['unique_id'], row['number_plate'], mileage, valuation_number))
+        else:
+            # Queue failure record
+            pending_failures.append((row['unique_id'], row['number_plate'], mileage, failure_reason))
+    
+    async def flush_pending():
+        nonlocal success_count, failure_count, pending_valuations, pending_failures
+        # Take the buffers before awaiting so concurrent workers start new ones
+        valuations, pending_valuations = pending_valuations, []
+        failures, pending_failures = pending_failures, []
+        if not (valuations or failures):
+            return
         
-        for i, row in enumerate(rows):
-            unique_id = row['unique_id']
-            plate = row['number_plate']
-            mileage = row['mileage'] or 0
-            salvage_category = row['salvage_category']
+        try:
+            async with pool.acquire() as conn:
+                if valuations:
+                    if await insert_valuations(conn, valuations):
+                        success_count += len(valuations)
+                    else:
+                        failures.extend(
+                            (unique_id, plate, mileage, "Database insertion failed")
+                            for unique_id, plate, mileage, _ in valuations
+                        )
+                    valuations = []
+                if failures:
+                    await insert_failures(conn, failures)
+                    failure_count += len(failures)
+                    failures = []
+        except Exception:
+            # Put back whatever was not written so the next flush retries it
+            pending_valuations[:0] = valuations
+            pending_failures[:0] = failures
+            raise
+    
+    async def flusher(stop):
+        # Write on a timer too, so a slow stretch doesn't hold results in memory
+        while not stop.is_set():
+            try:
+                await asyncio.wait_for(stop.wait(), RetryConfig.DB_FLUSH_INTERVAL)
+            except asyncio.TimeoutError:
+                try:
+                    await flush_pending()
+                except Exception as e:
+                    print(f"Error flushing pending results: {str(e)}")
+    
+    async def producer():
+        source = rows if hasattr(rows, '__aiter__') else _iter_rows(rows)
+        try:
+            i = -1
+            async for row in source:
+                i += 1
+                key = plate_key(row)
+                if key in outcomes:
+                    record(row, *outcomes[key])
+                    retry_stats.record_duplicate()
+                elif key in duplicates:
+                    duplicates[key].append(row)
+                    retry_stats.record_duplicate()
+                else:
+                    duplicates[key] = []
+                    await queue.put((i, row))
+        finally:
+            await source.aclose()
+        # One stop marker per worker
+        for _ in range(RetryConfig.CONCURRENCY):
+            await queue.put(None)
+    
+    async def worker():
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            i, row = item
             
-            print(f"\n[{i+1}/{len(rows)}] Processing {plate}")
+            plate = row['number_plate']
+            key = plate_key(row)
             
-            # Check if we should force restart
+            # Check if we should force restart (the row is left for the next attempt)
             if retry_stats.should_force_restart():
-                print(f"Force restart threshold reached - stopping batch")
-                break
+                unhandled_rows.append(row)
+                unhandled_rows.extend(duplicates.pop(key))
+                continue
+            
+            print(f"\n[{i+1}/{total}] Processing {plate}")
             
+            base_valuation = None
+            failure_reason = None
             try:
-                success, result_msg = await process_single_valuation_with_retry(row)
+                success, _, original_valuation, result_msg = await process_single_valuation_with_retry(
+                    row, shared_browser
+                )
                 
                 if success:
-                    # Extract valuation from success message
-                    valuation_match = result_msg.replace('Success: £', '').replace(',', '')
-                    valuation_number = float(valuation_match)
-                    
-                    # Determine original valuation for salvage categories
-                    original_valuation = None
-                    if salvage_category in ['CAT N', 'CAT S']:
-                        if salvage_category == 'CAT N':
-                            original_valuation = valuation_number / 0.85
-                        elif salvage_category == 'CAT S':
-                            original_valuation = valuation_number / 0.70
-                    
-                    # Insert into valid_valuation table
-                    insert_success = await insert_valuation(
-                        conn, unique_id, plate, mileage, valuation_number,
-                        original_valuation, salvage_category
-                    )
-                    
-                    if insert_success:
-                        success_count += 1
-                        await verify_record_exists(conn, unique_id)
-                    else:
-                        await insert_failure(conn, unique_id, plate, mileage, "Database insertion failed")
-                        failure_count += 1
+                    # Each row (duplicates included) applies its own salvage factor to this
+                    base_valuation = original_valuation
                 else:
-                    # Insert failure record
-                    await insert_failure(conn, unique_id, plate, mileage, result_msg)
-                    failure_count += 1
+                    failure_reason = result_msg
                     
             except Exception as e:
-                print(f"Unexpected error processing {plate}: {str(e)}")
-                traceback.print_exc()
-                await insert_failure(conn, unique_id, plate, mileage, f"Unexpected error: {str(e)}")
-                failure_count += 1
+                log.exception("Unexpected error processing %s", plate)
+                failure_reason = f"Unexpected error: {str(e)}"
+            
+            # The result also stands for any duplicate rows of this plate
+            outcomes[key] = (base_valuation, failure_reason)
+            for duplicate in [row] + duplicates.pop(key):
+                record(duplicate, base_valuation, failure_reason)
+            
+            if len(pending_valuations) + len(pending_failures) >= RetryConfig.DB_BATCH_SIZE:
+                try:
+                    await flush_pending()
+                except Exception as e:
+                    print(f"Error flushing pending results: {str(e)}")
+    
+    try:
+        pool = await get_pool()
+        stop_flusher = asyncio.Event()
+        flusher_task = asyncio.create_task(flusher(stop_flusher))
+        tasks = [asyncio.create_task(producer())]
+        tasks += [asyncio.create_task(worker()) for _ in range(RetryConfig.CONCURRENCY)]
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            # Don't leave the producer blocked on a full queue if a worker failed
+            for task in tasks:
+                task.cancel()
+            # Stopped rather than cancelled so a write in progress completes
+            stop_flusher.set()
+            await flusher_task
+        
+        if retry_stats.should_force_restart():
+            print(f"Force restart threshold reached - stopped batch")
+    
+        # Duplicates whose plate was never valued (stopped early) go back for a retry
+        for waiting in duplicates.values():
+            unhandled_rows.extend(waiting)
     
     finally:
-        if conn:
-            await conn.close()
+        if pool:
+            # Write whatever is still queued
+            try:
+                await flush_pending()
+            except Exception as e:
+                print(f"Error flushing pending results: {str(e)}")
+        # Collect once per batch rather than between rows
+        await force_memory_cleanup()
     
-    return success_count, failure_count
+    return success_count, failure_count, unhandled_rows
 
-async def process_all_entries_with_retry():
+async def process_all_entries_with_retry(rows: Optional[List] = None, total_entries: Optional[int] = None):
     """
-    Main entry point for batch processing with comprehensive retry logic
+    Main entry point for batch processing with comprehensive retry logic.
+    Without `rows` the entries are streamed from the database while valuing starts;
+    pass `total_entries` if the caller has already counted them.
     """
     print(f"=== WBAC SCRAPER WITH RETRY MECHANISM ===")
     print(f"Platform: {platform.system()}")
@@ -386,46 +743,54 @@ async def process_all_entries_with_retry():
     # Reset statistics
     retry_stats.reset()
     
-    conn = None
     total_success = 0
     total_failure = 0
+    shared_browser = SharedBrowser(RetryConfig.CONCURRENCY)
+    stop_watching = asyncio.Event()
+    memory_watcher = None
     
     try:
-        # Fetch all entries to process
-        conn = await connect_to_database()
-        rows = await fetch_valuations_to_process(conn)
-        await conn.close()
-        conn = None
+        # Count up front for progress display; the rows themselves are streamed
+        # (the pool is shared with the batch attempts below)
+        if rows is not None:
+            total_entries = len(rows)
+        elif total_entries is None:
+            pool = await get_pool()
+            async with pool.acquire() as conn:
+                total_entries = await count_valuations_to_process(conn)
         
-        print(f"Found {len(rows)} entries to valuate")
+        print(f"Found {total_entries} entries to valuate")
         
-        if not rows:
+        if not total_entries:
             print("No entries to process")
             return 0, 0
         
+        # One browser for the whole run (fresh context per plate)
+        await shared_browser.start()
+        memory_watcher = asyncio.create_task(watch_memory(stop_watching, shared_browser))
+        
         # Process in batches with retry
         batch_attempt = 0
-        remaining_rows = rows
+        remaining_rows = rows if rows is not None else stream_rows_to_process()
+        remaining_count = total_entries
         
-        while remaining_rows and batch_attempt < RetryConfig.BATCH_MAX_RETRIES:
+        while remaining_count and batch_attempt < RetryConfig.BATCH_MAX_RETRIES:
             batch_attempt += 1
             print(f"\n=== BATCH ATTEMPT {batch_attempt}/{RetryConfig.BATCH_MAX_RETRIES} ===")
-            print(f"Processing {len(remaining_rows)} entries")
+            print(f"Processing {remaining_count} entries")
             
             try:
-                success_count, failure_count = await batch_level_retry(remaining_rows)
+                success_count, failure_count, unhandled_rows = await batch_level_retry(
+                    remaining_rows, shared_browser, remaining_count
+                )
                 total_success += success_count
                 total_failure += failure_count
                 
                 print(f"Batch {batch_attempt} results: {success_count} success, {failure_count} failed")
                 
-                # If we processed everything successfully, we're done
-                if success_count + failure_count >= len(remaining_rows):
-                    break
-                
-                # Calculate remaining entries (those that weren't processed due to errors)
-                processed_count = success_count + failure_count
-                remaining_rows = remaining_rows[processed_count:]
+                # Later attempts only retry the rows this one left unhandled
+                remaining_rows = unhandled_rows
+                remaining_count = len(unhandled_rows)
                 
                 if remaining_rows:
                     retry_stats.record_batch_retry()
@@ -435,14 +800,14 @@ async def process_all_entries_with_retry():
                         RetryConfig.BATCH_RETRY_DELAY_MAX
                     )
                     print(f"Retrying batch in {delay:.1f} seconds...")
-                    if IS_WINDOWS:
-                        time.sleep(delay)
-                    else:
-                        await asyncio.sleep(delay)
+                    await asyncio.sleep(delay)
                 
-            except Exception as e:
-                print(f"Batch attempt {batch_attempt} failed: {str(e)}")
-                traceback.print_exc()
+            except Exception:
+                log.exception("Batch attempt %s failed", batch_attempt)
+                
+                # A partly consumed stream can't be replayed, so open a fresh one
+                if not isinstance(remaining_rows, list):
+                    remaining_rows = stream_rows_to_process()
                 
                 if batch_attempt < RetryConfig.BATCH_MAX_RETRIES:
                     delay = exponential_backoff(
@@ -451,27 +816,27 @@ async def process_all_entries_with_retry():
                         RetryConfig.BATCH_RETRY_DELAY_MAX
                     )
                     print(f"Retrying entire batch in {delay:.1f} seconds...")
-                    if IS_WINDOWS:
-                        time.sleep(delay)
-                    else:
-                        await asyncio.sleep(delay)
+                    await asyncio.sleep(delay)
         
         # Final statistics
-        duration = datetime.now() - retry_stats.start_time
+        duration_s = retry_stats.runtime_seconds()
         print(f"\n=== FINAL RESULTS ===")
         print(f"Total processed: {total_success + total_failure}")
         print(f"Successful: {total_success}")
         print(f"Failed: {total_failure}")
-        print(f"Total runtime: {duration.total_seconds():.1f} seconds")
-        print(f"Average time per valuation: {duration.total_seconds() / max(1, total_success + total_failure):.1f}s")
+        print(f"Total runtime: {duration_s:.1f} seconds")
+        print(f"Average time per valuation: {duration_s / max(1, total_success + total_failure):.1f}s")
         print(retry_stats.get_summary())
         
         return total_success, total_failure
         
-    except Exception as e:
-        print(f"Critical error in process_all_entries_with_retry: {str(e)}")
-        traceback.print_exc()
+    except Exception:
+        log.exception("Critical error in process_all_entries_with_retry")
         return total_success, total_failure
     finally:
-        if conn:
-            await conn.close()
+        if memory_watcher:
+            # Stopped rather than cancelled so a recycle in progress completes
+            stop_watching.set()
+            await memory_watcher
+        await shared_browser.close()
+        await close_pool()
@@ -2,41 +2,90 @@
 Core valuation service for processing license plates through WBAC
 """
 import asyncio
+import logging
 import random
 import sys
 import os
 import platform
 import time
-import traceback
 
 # Fix for Windows subprocess implementation
 if sys.platform == 'win32':
     asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
     
+log = logging.getLogger(__name__)
+
 # Determine if we're running on Windows
 IS_WINDOWS = platform.system() == 'Windows'
 
-# Import appropriate Playwright modules
-from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeoutError
+# Import appropriate Playwright modules. browser_utils loads the async API on every
+# platform, and its TimeoutError is the one both APIs raise; the sync API is only
+# imported by process_valuation_sync, which runs on Windows.
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
 
 # Import for non-Windows environments
 if not IS_WINDOWS:
     from playwright.async_api import async_playwright
 
-from .config import WBAC_URL
-from .human_behavior import (
-    generate_random_email, generate_random_postcode, generate_random_uk_phone,
-    human_type, simulate_human_behavior
-)
+from .config import WBAC_URL, CHROMIUM_ARGS, NAVIGATION_TIMEOUT
+from .human_behavior import get_identity, human_type, record_plate_valued, simulate_human_behavior
 from .browser_utils import (
-    check_for_car_not_found, ValuationError, setup_browser, setup_page
+    block_heavy_resources_sync, check_for_car_not_found, check_for_car_not_found_sync,
+    save_debug_screenshot, save_debug_screenshot_sync, wait_for_valuation, wait_for_valuation_sync,
+    ValuationError, setup_browser, setup_context, setup_page,
+    FIND_VALUATION_TEXT_JS, VALUATION_SELECTORS
 )
 
-async def process_valuation(plate, mileage):
+# True once the page after the registration step has rendered: the contact form,
+# the valuation itself, or the "couldn't find your car" message
+NEXT_STEP_READY_JS = """
+    () => Boolean(document.querySelector('#EmailAddress, #advance-btn, div.amount'))
+        || (document.body !== null
+            && document.body.innerText.toLowerCase().includes("couldn't find your car"))
+"""
+NEXT_STEP_TIMEOUT = 20000  # 20 seconds
+VALUATION_TIMEOUT = 30000  # 30 seconds
+
+# Keys that may hold the amount in the JSON answer to the valuation request
+VALUATION_JSON_KEYS = ("amount", "price", "valuation")
+# How many valuation responses get printed next to the rendered amount, to confirm
+# the endpoint and schema. Observe only: the valuation always comes from the page.
+LOGGED_RESPONSE_LIMIT = 3
+_logged_responses = 0
+
+def _is_valuation_response(response):
+    """True for a JSON answer to a POST whose URL mentions the valuation"""
+    return (response.request.method == "POST"
+            and "valuation" in response.url.lower()
+            and "json" in response.headers.get("content-type", ""))
+
+async def _log_valuation_response(response, plate, valuation_text):
+    """Print a valuation response's keys and candidate amounts beside the page's amount"""
+    global _logged_responses
+    if _logged_responses >= LOGGED_RESPONSE_LIMIT:
+        return
+    try:
+        data = await response.json()
+    except Exception:
+        return
+    if not isinstance(data, dict):
+        return
+    _logged_responses += 1
+    candidates = {key: data[key] for key in VALUATION_JSON_KEYS if key in data}
+    print(f"Valuation response from {response.url} has keys: {sorted(data)}; "
+          f"candidates {candidates} vs page {valuation_text} for {plate}")
+
+def _discard_result(task):
+    """Retrieve a background task's outcome so an unused timeout is not reported"""
+    if not task.cancelled():
+        task.exception()
+
+async def process_valuation(plate, mileage, browser=None):
     """
     Use Playwright to interact with the valuation website and extract the valuation text.
     Incorporates human-like behavior to avoid bot detection.
     Uses sync API on Windows and async API on other platforms.
+    On other platforms an already launched async `browser` can be passed in to be shared.
     """
     # Validate and adjust mileage if needed
     if mileage == 0 or mileage is None:
@@ -53,42 +102,44 @@ async def process_valuation(plate, mileage):
         return await asyncio.to_thread(process_valuation_sync, plate, mileage)
     else:
         # For non-Windows platforms, use the async API
-        return await process_valuation_async(plate, mileage)
+        return await process_valuation_async(plate, mileage, browser)
 
 
 def process_valuation_sync(plate, mileage):
     """
     Synchronous implementation of the valuation process for Windows systems.
     """
+    from playwright.sync_api import sync_playwright
     browser = None
     try:
-        print(f"Starting synchronous valuation process for {plate} with mileage {mileage}")
+        log.debug("Starting synchronous valuation process for %s with mileage %s", plate, mileage)
         with sync_playwright() as p:
             # Launch browser with configuration from the config module
-            browser = p.chromium.launch(headless=False)
+            browser = p.chromium.launch(headless=False, args=CHROMIUM_ARGS)
             context = browser.new_context(
                 viewport={'width': 1366, 'height': 768},
                 user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/112.0.0.0 Safari/537.36",
                 locale="en-GB"
             )
+            # Skip images, fonts and analytics, as the async flow does
+            context.route("**/*", block_heavy_resources_sync)
             
             # Create a new page
             page = context.new_page()
             
             # Navigate to the WBAC site
-            print(f"Navigating to {WBAC_URL}")
-            page.goto(WBAC_URL)
-            time.sleep(0.5)  # Short delay after navigation
+            log.debug("Navigating to %s", WBAC_URL)
+            page.goto(WBAC_URL, wait_until="domcontentloaded", timeout=NAVIGATION_TIMEOUT)
             
             # Handle cookie consent if present
             try:
                 cookie_button = page.wait_for_selector('#onetrust-accept-btn-handler', timeout=5000)
                 if cookie_button:
-                    print("Accepting cookies...")
+                    log.debug("Accepting cookies...")
                     cookie_button.click()
                     time.sleep(0.2)
             except Exception:
-                print("No cookie banner found or error handling cookies")
+                log.debug("No cookie banner found or error handling cookies")
             
             # Fill in the registration plate
             reg_input = page.query_selector('#vehicleReg')
@@ -96,10 +147,10 @@ def process_valuation_sync(plate, mileage):
                 print("Could not find registration input field")
                 return None
                 
-            # Type like a human
-            for character in plate:
-                reg_input.type(character)
-                time.sleep(random.uniform(0.05, 0.2))  # Random delay between keystrokes
+            # Focus and fill in one go, then pause briefly like a human would
+            reg_input.click()
+            reg_input.fill(plate)
+            time.sleep(random.uniform(0.15, 0.35))
             
             # Fill in mileage
             mileage_input = page.query_selector('#Mileage')
@@ -117,26 +168,26 @@ def process_valuation_sync(plate, mileage):
             go_button = page.query_selector('#btn-go')
             if go_button:
                 go_button.click()
-                print("Clicked valuation button")
+                log.debug("Clicked valuation button")
             else:
                 print("Could not find valuation button")
                 return None
             
-            # Wait for page to load
-            time.sleep(random.uniform(2, 4))
+            # Wait for the next step to render (the checks below handle a timeout)
+            try:
+                page.wait_for_function(NEXT_STEP_READY_JS, timeout=NEXT_STEP_TIMEOUT)
+            except PlaywrightTimeoutError:
+                print(f"Next step did not appear for {plate}")
             
             # Check if car was found
-            content = page.content()
-            if "sorry, we couldn't find your car" in content.lower():
+            if check_for_car_not_found_sync(page):
                 print(f"Car not found: {plate}")
                 return None
             
             # Fill out form fields if present
             try:
-                # Generate random email, postcode, and phone number
-                email = generate_random_email()
-                postcode = generate_random_postcode()
-                phone = generate_random_uk_phone()
+                # Email, postcode and phone number from the identity pool
+                email, postcode, phone = get_identity()
                 
                 # Fill form fields
                 email_field = page.query_selector('#EmailAddress')
@@ -155,255 +206,60 @@ def process_valuation_sync(plate, mileage):
                 advance_button = page.query_selector('#advance-btn')
                 if advance_button:
                     advance_button.click()
-                    print("Clicked advance button")
-                    time.sleep(2)  # Wait for valuation
+                    log.debug("Clicked advance button")
             except Exception as e:
                 print(f"Error filling form: {e}")
             
             # Extract valuation using multiple selectors
             try:
-                page.wait_for_selector('div.amount, div.price, .valuation-amount', timeout=30000)
-                valuation_text = None
-                
-                # Try multiple possible selectors
-                for selector in ["div.amount", "div.price", ".valuation-amount", ".car-value"]:
-                    element = page.query_selector(selector)
-                    if element:
-                        valuation_text = element.inner_text()
-                        if valuation_text and valuation_text.strip():
-                            break
-                
-                # If nothing found, try JavaScript approach
-                if not valuation_text:
-                    valuation_text = page.evaluate("""
-                        () => {
-                            const elems = document.querySelectorAll('div, span, h1, h2, h3, h4');
-                            for (const el of elems) {
-                                const text = el.innerText || el.textContent;
-                                if (text && text.includes('£') && /\d/.test(text)) {
-                                    return text;
-                                }
-                            }
-                            return null;
-                        }
-                    """)
+                if not wait_for_valuation_sync(page):
+                    print(f"Car not found while waiting for valuation: {plate}")
+                    return None
+                valuation_text = page.evaluate(FIND_VALUATION_TEXT_JS, VALUATION_SELECTORS)
                 
                 if valuation_text:
                     print(f"Valuation for {plate}: {valuation_text.strip()}")
                     return valuation_text.strip()
                 else:
                     print(f"No valuation found for {plate}")
-                    # Take screenshot for debugging
-                    try:
-                        page.screenshot(path=f"no_valuation_{plate}.png")
-                    except Exception:
-                        pass
+                    save_debug_screenshot_sync(page, f"no_valuation_{plate}.png")
                     return None
                     
             except Exception as e:
                 print(f"Error extracting valuation: {e}")
                 return None
                 
-    except Exception as e:
-        print(f"Error in synchronous process: {e}")
-        traceback.print_exc()
+    except Exception:
+        log.exception("Error in synchronous process for %s", plate)
         return None
     finally:
         if browser:
             try:
                 browser.close()
-                print(f"Browser closed for {plate}")
+                log.debug("Browser closed for %s", plate)
             except Exception as e:
                 print(f"Error closing browser: {e}")
 
 
-async def process_valuation_async(plate, mileage):
+async def process_valuation_async(plate, mileage, browser=None):
     """
     Asynchronous implementation of the valuation process for non-Windows systems.
+    If a shared browser is given the plate gets its own context in it; otherwise a
+    browser is launched and closed for this plate.
     """
-    browser = None
-    total_bytes = 0  # Initialize bandwidth counter
+    playwright = None
+    owned_browser = None
+    context = None
     
     try:
-        async with async_playwright() as p:
-            # Launch browser and create context
-            browser, context = await setup_browser(p)
-            page, total_bytes = await setup_page(context)
-            
-            # Navigate to WBAC website
-            await page.goto(WBAC_URL)
-            await asyncio.sleep(0.3)
-            
-            # Handle cookie banner
-            try:
-                cookie_button = await page.wait_for_selector("#onetrust-accept-btn-handler", timeout=5000)
-                if cookie_button:
-                    await page.click("#onetrust-accept-btn-handler")
-                    await asyncio.sleep(0.2)
-            except Exception:
-                pass
-            
-            # Short pause
-            await asyncio.sleep(0.5)
-            
-            # Simulate human behavior
-            await simulate_human_behavior(page)
-            
-            # ----- PAGE VARIATION HANDLING -----
-            max_attempts = 3
-            attempts = 0
-            while attempts < max_attempts:
-                attempts += 1
-                if await check_for_car_not_found(page):
-                    print(f"Car not found (during page variation handling): {plate}")
-                    return None
-                
-                # Try multiple selectors for registration and mileage fields
-                reg_field = await page.query_selector("#vehicleReg, input[placeholder*='registration'], input[name*='reg']")
-                mileage_field = await page.query_selector("#Mileage, input[placeholder*='mileage'], input[name*='mileage']")
-                
-                if reg_field and mileage_field:
-                    print(f"Standard page with both fields detected for {plate}")
-                    break
-                elif reg_field and not mileage_field:
-                    print(f"Variant page with only reg field detected for {plate} (attempt {attempts})")
-                    await human_type(page, "#vehicleReg", plate)
-                    button_clicked = False
-                    for btn_selector in ['button:has-text("Get my car valuation")', 'button[type="submit"]']:
-                        if await page.query_selector(btn_selector):
-                            await page.click(btn_selector)
-                            button_clicked = True
-                            print(f"Clicked {btn_selector} for {plate}")
-                            break
-                    if not button_clicked:
-                        form = await page.query_selector('form')
-                        if form:
-                            await page.evaluate('document.querySelector("form").submit()')
-                            button_clicked = True
-                            print(f"Submitted form for {plate}")
-                    if not button_clicked:
-                        print(f"Warning: Could not find button to click for {plate}")
-                    await asyncio.sleep(random.uniform(2, 4))
-                    # Simulate a human reading the page after form submission
-                    await simulate_human_behavior(page)
-                else:
-                    print(f"Unexpected page state for {plate} - no reg field found")
-                    await page.screenshot(path=f"unexpected_page_{plate}.png")
-                    await page.reload()
-                    await asyncio.sleep(random.uniform(1.5, 3.0))
-            
-            if attempts >= max_attempts:
-                print(f"Exceeded maximum attempts ({max_attempts}) for {plate}")
-                return None
-            
-            if await check_for_car_not_found(page):
-                print(f"Car not found (before standard flow): {plate}")
-                return None
-            
-            # Standard flow: Fill in registration and mileage
-            await human_type(page, "#vehicleReg", plate)
-            await human_type(page, "#Mileage", str(int(mileage)))
-            # Simulate a brief pause before clicking the valuation button
-            await asyncio.sleep(random.uniform(0.5, 1.5))
-            await page.click("#btn-go")
-            await asyncio.sleep(random.uniform(2, 4))
-            if await check_for_car_not_found(page):
-                print(f"Car not found after form submission: {plate}")
-                return None
-            
-            # Simulate human behavior before filling contact form
-            await simulate_human_behavior(page)
-            
-            # Fill out the contact form
-            await page.fill("#EmailAddress", generate_random_email())
-            await page.fill("#Postcode", generate_random_postcode())
-            await page.fill("#TelephoneNumber", generate_random_uk_phone())
-            
-            # Handle survey if present
-            try:
-                survey_selector = await page.query_selector("#VehicleDetailsSurvey")
-                if survey_selector:
-                    await page.select_option("#VehicleDetailsSurvey", str(random.randint(1, 5)))
-            except Exception:
-                pass
-            
-            # Handle VAT section
-            try:
-                vat_section = await page.query_selector('label[for="IsVatRegistered"]')
-                if vat_section:
-                    print(f"VAT section found for {plate}")
-                    for selector in ['label[for="IsVatRegisteredtrue"]', '#IsVatRegisteredtrue']:
-                        if await page.query_selector(selector):
-                            await page.click(selector)
-                            print(f"Selected Yes using {selector}")
-                            break
-                    try:
-                        await page.evaluate('''
-                            let radio = document.querySelector('#IsVatRegisteredtrue');
-                            if (radio) {
-                                radio.checked = true;
-                                radio.dispatchEvent(new Event('change', { bubbles: true }));
-                            }
-                        ''')
-                    except Exception:
-                        pass
-                else:
-                    print(f"No VAT section for {plate}, continuing")
-            except Exception as e:
-                print(f"Error handling VAT section: {e}")
-            
-            # Click advance button using multiple selectors
-            try:
-                for selector in ["#advance-btn", 'button:has-text("Show my valuation")', 'button[type="submit"]']:
-                    if await page.query_selector(selector):
-                        await page.click(selector)
-                        print(f"Clicked {selector} for {plate}")
-                        break
-            except Exception as e:
-                print(f"Error clicking advance button: {e}")
-                if await check_for_car_not_found(page):
-                    print(f"Car not found after advance button error: {plate}")
-                    return None
-                raise
-            
-            await asyncio.sleep(2.0)
-            
-            # Extract valuation using multiple selectors
-            try:
-                await page.wait_for_selector("div.amount, div.price, .valuation-amount", state="attached", timeout=30000)
-                valuation_text = None
-                for selector in ["div.amount", "div.price", ".valuation-amount", ".car-value"]:
-                    element = await page.query_selector(selector)
-                    if element:
-                        valuation_text = await element.inner_text()
-                        if valuation_text and valuation_text.strip():
-                            break
-                if not valuation_text:
-                    valuation_text = await page.evaluate('''
-                        () => {
-                            const elems = document.querySelectorAll('div, span, h1, h2, h3, h4');
-                            for (const el of elems) {
-                                const text = el.innerText || el.textContent;
-                                if (text && text.includes('£') && /\d/.test(text)) {
-                                    return text;
-                                }
-                            }
-                            return null;
-                        }
-                    ''')
-                if valuation_text:
-                    print(f"Valuation for {plate}: {valuation_text.strip()}")
-                    print(f"Total bandwidth used for listing {plate}: {total_bytes} bytes")
-                    return valuation_text.strip()
-                else:
-                    await page.screenshot(path=f"no_valuation_{plate}.png")
-                    raise ValuationError("No valuation found on page")
-            except PlaywrightTimeoutError:
-                await page.screenshot(path=f"timeout_{plate}.png")
-                if await check_for_car_not_found(page):
-                    print(f"Car not found after timeout: {plate}")
-                    return None
-                raise ValuationError("Timeout waiting for valuation")
+        if browser is None:
+            playwright = await async_playwright().start()
+            owned_browser, context = await setup_browser(playwright)
+        else:
+            context = await setup_context(browser)
+        page = await setup_page(context)
+        
+        return await _value_on_page_async(page, plate, mileage)
         
     except Exception as e:
         if not isinstance(e, ValuationError):
@@ -411,12 +267,192 @@ async def process_valuation_async(plate, mileage):
             raise ValuationError(f"Unexpected error: {str(e)}")
         raise
     finally:
-        if browser:
+        if owned_browser:
             try:
-                await browser.close()
-                print(f"Browser closed for {plate}")
+                await owned_browser.close()
+                log.debug("Browser closed for %s", plate)
             except Exception as e:
                 print(f"Error closing browser: {e}")
+        elif context:
+            try:
+                await context.close()
+            except Exception as e:
+                print(f"Error closing context: {e}")
+        if playwright:
+            await playwright.stop()
+
+async def _value_on_page_async(page, plate, mileage):
+    """Run the valuation flow on an open page and return the valuation text"""
+    # Navigate to WBAC website; the cookie banner wait below covers the rest of the load
+    await page.goto(WBAC_URL, wait_until="domcontentloaded")
+    
+    # Handle cookie banner
+    try:
+        cookie_button = await page.wait_for_selector("#onetrust-accept-btn-handler", timeout=5000)
+        if cookie_button:
+            await page.click("#onetrust-accept-btn-handler")
+            await asyncio.sleep(0.2)
+    except Exception:
+        pass
+    
+    # Short pause
+    await asyncio.sleep(0.5)
+    
+    # Simulate human behavior
+    await simulate_human_behavior(page)
+    
+    # ----- PAGE VARIATION HANDLING -----
+    max_attempts = 3
+    attempts = 0
+    while attempts < max_attempts:
+        attempts += 1
+        if await check_for_car_not_found(page):
+            print(f"Car not found (during page variation handling): {plate}")
+            return None
+        
+        # Try multiple selectors for registration and mileage fields
+        reg_field = await page.query_selector("#vehicleReg, input[placeholder*='registration'], input[name*='reg']")
+        mileage_field = await page.query_selector("#Mileage, input[placeholder*='mileage'], input[name*='mileage']")
+        
+        if reg_field and mileage_field:
+            log.debug("Standard page with both fields detected for %s", plate)
+            break
+        elif reg_field and not mileage_field:
+            log.debug("Variant page with only reg field detected for %s (attempt %s)", plate, attempts)
+            await human_type(page, "#vehicleReg", plate)
+            button_clicked = False
+            for btn_selector in ['button:has-text("Get my car valuation")', 'button[type="submit"]']:
+                if await page.query_selector(btn_selector):
+                    await page.click(btn_selector)
+                    button_clicked = True
+                    log.debug("Clicked %s for %s", btn_selector, plate)
+                    break
+            if not button_clicked:
+                form = await page.query_selector('form')
+                if form:
+                    await page.evaluate('document.querySelector("form").submit()')
+                    button_clicked = True
+                    log.debug("Submitted form for %s", plate)
+            if not button_clicked:
+                print(f"Warning: Could not find button to click for {plate}")
+            await asyncio.sleep(random.uniform(2, 4))
+            # Simulate a human reading the page after form submission
+            await simulate_human_behavior(page)
+        else:
+            print(f"Unexpected page state for {plate} - no reg field found")
+            await save_debug_screenshot(page, f"unexpected_page_{plate}.png")
+            await page.reload()
+            await asyncio.sleep(random.uniform(1.5, 3.0))
     
-    # This line should never be reached as all code paths return a value
-    return None
+    if attempts >= max_attempts:
+        print(f"Exceeded maximum attempts ({max_attempts}) for {plate}")
+        return None
+    
+    if await check_for_car_not_found(page):
+        print(f"Car not found (before standard flow): {plate}")
+        return None
+    
+    # Standard flow: Fill in registration and mileage
+    await human_type(page, "#vehicleReg", plate)
+    await human_type(page, "#Mileage", str(int(mileage)))
+    # Simulate a brief pause before clicking the valuation button
+    await asyncio.sleep(random.uniform(0.5, 1.5))
+    await page.click("#btn-go")
+    try:
+        await page.wait_for_function(NEXT_STEP_READY_JS, timeout=NEXT_STEP_TIMEOUT)
+    except PlaywrightTimeoutError:
+        print(f"Next step did not appear for {plate}")
+    if await check_for_car_not_found(page):
+        print(f"Car not found after form submission: {plate}")
+        return None
+    
+    # Simulate human behavior before filling contact form
+    await simulate_human_behavior(page)
+    
+    # Fill out the contact form
+    email, postcode, phone = get_identity()
+    await page.fill("#EmailAddress", email)
+    await page.fill("#Postcode", postcode)
+    await page.fill("#TelephoneNumber", phone)
+    
+    # Handle survey if present
+    try:
+        survey_selector = await page.query_selector("#VehicleDetailsSurvey")
+        if survey_selector:
+            await page.select_option("#VehicleDetailsSurvey", str(random.randint(1, 5)))
+    except Exception:
+        pass
+    
+    # Handle VAT section
+    try:
+        vat_section = await page.query_selector('label[for="IsVatRegistered"]')
+        if vat_section:
+            log.debug("VAT section found for %s", plate)
+            for selector in ['label[for="IsVatRegisteredtrue"]', '#IsVatRegisteredtrue']:
+                if await page.query_selector(selector):
+                    await page.click(selector)
+                    log.debug("Selected Yes using %s", selector)
+                    break
+            try:
+                await page.evaluate('''
+                    let radio = document.querySelector('#IsVatRegisteredtrue');
+                    if (radio) {
+                        radio.checked = true;
+                        radio.dispatchEvent(new Event('change', { bubbles: true }));
+                    }
+                ''')
+            except Exception:
+                pass
+        else:
+            log.debug("No VAT section for %s, continuing", plate)
+    except Exception as e:
+        print(f"Error handling VAT section: {e}")
+    
+    # Listen for the valuation request's answer before clicking, so its schema can be
+    # compared with the rendered amount; only until LOGGED_RESPONSE_LIMIT have been printed
+    response_task = None
+    if _logged_responses < LOGGED_RESPONSE_LIMIT:
+        response_task = asyncio.ensure_future(
+            page.wait_for_response(_is_valuation_response, timeout=VALUATION_TIMEOUT))
+        response_task.add_done_callback(_discard_result)
+    try:
+        # Click advance button using multiple selectors
+        try:
+            for selector in ["#advance-btn", 'button:has-text("Show my valuation")', 'button[type="submit"]']:
+                if await page.query_selector(selector):
+                    await page.click(selector)
+                    log.debug("Clicked %s for %s", selector, plate)
+                    break
+        except Exception as e:
+            print(f"Error clicking advance button: {e}")
+            if await check_for_car_not_found(page):
+                print(f"Car not found after advance button error: {plate}")
+                return None
+            raise
+        
+        # Extract valuation using multiple selectors
+        try:
+            if not await wait_for_valuation(page):
+                print(f"Car not found while waiting for valuation: {plate}")
+                return None
+            valuation_text = await page.evaluate(FIND_VALUATION_TEXT_JS, VALUATION_SELECTORS)
+            if valuation_text:
+                valuation_text = valuation_text.strip()
+                print(f"Valuation for {plate}: {valuation_text}")
+                if (response_task is not None and response_task.done() and not response_task.cancelled()
+                        and response_task.exception() is None):
+                    await _log_valuation_response(response_task.result(), plate, valuation_text)
+                record_plate_valued(page)
+                return valuation_text
+            else:
+                await save_debug_screenshot(page, f"no_valuation_{plate}.png")
+                raise ValuationError("No valuation found on page")
+        except PlaywrightTimeoutError:
+            await save_debug_screenshot(page, f"timeout_{plate}.png")
+            if await check_for_car_not_found(page):
+                print(f"Car not found after timeout: {plate}")
+                return None
+            raise ValuationError("Timeout waiting for valuation")
+    finally:
+        if response_task is not None:
+            response_task.cancel()